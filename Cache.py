@@ -0,0 +1,177 @@
+import hashlib  # For turning URLs into cache file names.
+import json  # For storing cache entries.
+import os  # For cache directory handling and atomic writes.
+import threading  # For tracking background refreshes.
+import time  # For TTL bookkeeping.
+
+
+class ResponseCache:
+    """
+    ResponseCache Module.
+    A small on-disk cache of API responses, keyed by URL.
+
+    Every entry keeps the response data, the time it was stored and the validators (ETag, Last-Modified)
+    needed for a conditional refresh. Entries younger than the TTL are fresh; older entries are stale
+    but still usable, e.g. while a background refresh runs or when replaying offline.
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self, path: str = 'geonode_cache', ttl: int = 600, offline: bool = False):
+        """
+        Initialize the ResponseCache class.
+
+        :param path: Directory where the cache entries are stored. Created if missing.
+        :param ttl: Time-to-live of an entry in seconds. Default is 600 (10 minutes).
+        :param offline: Boolean flag to only replay cached entries and never touch the network.
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self.offline = offline
+        self.refreshing = set()  # URLs with a background refresh in progress.
+        self.lock = threading.Lock()  # Guards 'refreshing'.
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def __len__(self):
+        """Return the number of cached entries."""
+        return len([name for name in os.listdir(self.path) if name.endswith('.json')])
+
+    def __repr__(self):
+        """Return a representation of the ResponseCache instance."""
+        return f"ResponseCache '{self.path}' | TTL: {self.ttl}s | Offline: {self.offline} | Entries: {len(self)}"
+
+    # Path: Entry
+    def entry_path(self, url: str) -> str:
+        """
+        Return the file path of the cache entry for a URL.
+
+        :param url: The cached URL.
+        :return: Path of the entry file.
+        """
+
+        return os.path.join(self.path, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json")
+
+    # Load: Entry
+    def load(self, url: str) -> dict | None:
+        """
+        Load the cache entry for a URL.
+
+        :param url: The cached URL.
+        :return: Entry dictionary ('url', 'stored', 'etag', 'last_modified', 'data'), or None if not cached.
+        """
+
+        try:
+            with open(file=self.entry_path(url), mode='r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        # Guard against hash collisions and foreign files.
+        return entry if entry.get('url') == url else None
+
+    # Store: Entry
+    def store(self, url: str, data, etag: str = None, last_modified: str = None) -> None:
+        """
+        Store (or replace) the cache entry for a URL.
+
+        :param url: The cached URL.
+        :param data: The response data (anything JSON serializable).
+        :param etag: ETag header of the response, for conditional refreshes.
+        :param last_modified: Last-Modified header of the response, for conditional refreshes.
+        :return: None
+        """
+
+        entry = {'url': url, 'stored': time.time(), 'etag': etag, 'last_modified': last_modified, 'data': data}
+        path = self.entry_path(url)
+
+        # Write to a temporary file first, so readers never see a half written entry.
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(file=temporary, mode='w', encoding='utf-8') as file:
+            json.dump(entry, file)
+        os.replace(temporary, path)
+
+    # Touch: Entry
+    def touch(self, url: str) -> None:
+        """
+        Mark a cached entry as fresh again (after a '304 Not Modified').
+
+        :param url: The cached URL.
+        :return: None
+        """
+
+        entry = self.load(url)
+        if entry is not None:
+            self.store(url, entry['data'], etag=entry.get('etag'), last_modified=entry.get('last_modified'))
+
+    # Check: Fresh
+    def is_fresh(self, entry: dict) -> bool:
+        """
+        Check whether a cache entry is still inside its TTL.
+
+        :param entry: Entry dictionary from load().
+        :return: True if the entry is fresh.
+        """
+
+        return time.time() - entry.get('stored', 0) < self.ttl
+
+    # Validators: Conditional request
+    @staticmethod
+    def validators(entry: dict | None) -> dict:
+        """
+        Build the conditional request headers for a cache entry.
+
+        :param entry: Entry dictionary from load(), or None.
+        :return: Dictionary of 'If-None-Match' / 'If-Modified-Since' headers (empty if nothing to validate).
+        """
+
+        headers = {}
+
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        return headers
+
+    # Refresh: Claim
+    def claim_refresh(self, url: str) -> bool:
+        """
+        Claim the background refresh of a URL, so only one refresh per URL runs at a time.
+
+        :param url: The cached URL.
+        :return: True if the caller should run the refresh, False if one is already running.
+        """
+
+        with self.lock:
+            if url in self.refreshing:
+                return False
+            self.refreshing.add(url)
+            return True
+
+    # Refresh: Release
+    def release_refresh(self, url: str) -> None:
+        """
+        Release a refresh claimed with claim_refresh().
+
+        :param url: The cached URL.
+        :return: None
+        """
+
+        with self.lock:
+            self.refreshing.discard(url)
+
+    # Clear: Entries
+    def clear(self) -> None:
+        """
+        Delete every cached entry.
+
+        :return: None
+        """
+
+        for name in os.listdir(self.path):
+            if name.endswith('.json') or name.endswith('.tmp'):
+                os.remove(os.path.join(self.path, name))
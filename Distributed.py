@@ -0,0 +1,490 @@
+import json  # For the JSON-lines messages.
+import queue  # For handing results from the connection threads to the caller.
+import socket  # For the coordinator and worker TCP connections.
+import threading  # For serving many workers at once.
+import time  # For deadlines, leases and connection retries.
+from collections import deque  # For the queue of shards waiting for a worker.
+
+
+# Protocol version, sent in every 'hello' so mismatched nodes fail fast.
+PROTOCOL = 'proxytoolkit/1'
+
+
+class DistributedError(Exception):
+    """Raised when a peer breaks the coordinator/worker protocol."""
+
+
+# Protocol: Messages
+def send_message(sock: socket.socket, message: dict) -> None:
+    """Send one message (a JSON object on one line)."""
+    sock.sendall(json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n')
+
+
+def read_message(stream) -> dict:
+    """
+    Read one message from a socket file.
+
+    :param stream: Binary file from socket.makefile('rb').
+    :return: The message dictionary (raises DistributedError when the peer closed the connection).
+    """
+
+    line = stream.readline()
+    if not line:
+        raise DistributedError('Connection closed by peer')
+
+    try:
+        message = json.loads(line)
+    except ValueError:
+        raise DistributedError(f'Malformed message: {line[:80]!r}')
+
+    if not isinstance(message, dict) or 'type' not in message:
+        raise DistributedError(f'Malformed message: {line[:80]!r}')
+
+    return message
+
+
+def check_result(result) -> dict:
+    """
+    Check the shape of a result sent by a worker, so a buggy or hostile one cannot break the caller.
+    (Its 'info' is replaced with the coordinator's own proxy afterwards, see Coordinator.serve_worker.)
+
+    :param result: The 'result' of a worker message.
+    :return: The result, unchanged (raises DistributedError when a field is missing or has the wrong type).
+    """
+
+    number = (int, float)
+    info = result.get('info') if isinstance(result, dict) else None
+
+    valid = (
+        isinstance(info, dict)
+        and all(isinstance(info.get(key), (str, int)) for key in ('ip', 'port', 'protocol'))
+        and isinstance(result.get('alive'), bool)
+        and isinstance(result.get('time'), number + (type(None),))
+        and isinstance(result.get('status_code'), (int, type(None)))
+        and isinstance(result.get('content'), (str, type(None)))
+        and isinstance(result.get('error'), (str, type(None)))
+        and isinstance(result.get('depth'), (str, type(None)))
+        and isinstance(result.get('bytes', 0), int)
+        and isinstance(result.get('phases', {}), dict)
+        and all(isinstance(phase, str) and isinstance(seconds, number)
+                for phase, seconds in result.get('phases', {}).items())
+    )
+
+    if not valid:
+        raise DistributedError(f'Malformed result: {json.dumps(result)[:80]}')
+
+    return result
+
+
+class Coordinator:
+    """
+    Coordinator Module.
+    Splits a proxy list into shards and hands them out to workers (Worker) over TCP.
+
+    Protocol (one JSON object per line, both ways):
+        worker -> {'type': 'hello', 'protocol': PROTOCOL, 'name': ..., 'workers': N}
+        coord  -> {'type': 'shard', 'proxies': [[index, proxy], ...], 'timeout', 'depth', 'view'}
+        worker -> {'type': 'result', 'index': index, 'result': {...}}   (one per proxy, as checks finish)
+        coord  -> {'type': 'bye'}                                       (no work left)
+
+    A worker gets its next shard once every proxy of the current one is answered. When a worker
+    disconnects, or stays silent longer than the lease, the proxies it had not answered yet go back
+    to the queue for the other workers. A proxy whose worker was lost 'attempts' times is reported dead.
+    A worker that sends a malformed result is dropped the same way (see check_result).
+
+    Workers are not authenticated: the coordinator listens on 127.0.0.1 unless told otherwise,
+    and should only be exposed to a trusted network.
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self, proxies: list, host: str = '127.0.0.1', port: int = 7700, shard_size: int = 64,
+                 timeout: int = 9, depth: str = 'full', view: str = 'https://www.google.com', lease: float = None,
+                 attempts: int = 3, echo=None):
+        """
+        Initialize the Coordinator class.
+
+        :param proxies: List of proxies to check, each a dictionary with 'ip', 'port' and 'protocol'.
+        :param host: Address to listen on for workers. Default is '127.0.0.1' (this host only;
+                     '0.0.0.0' accepts workers on every interface).
+        :param port: Port to listen on (0 picks a free one, see self.port after start). Default is 7700.
+        :param shard_size: Number of proxies per shard. Default is 64.
+        :param timeout: Timeout for each proxy check in seconds, passed on to the workers.
+        :param depth: 'connect', 'handshake' or 'full' (see Toolkit.check_the_proxy), passed on to the workers.
+        :param view: Test URL, passed on to the workers.
+        :param lease: Seconds a worker may stay silent while holding a shard before it is dropped.
+                      Default is 3 check timeouts plus 10 seconds (a check can be retried once).
+        :param attempts: Number of workers a proxy may be handed to before it is reported dead. Default is 3.
+        :param echo: Optional output function with the Toolkit.echo signature, for verbose logging.
+        """
+
+        self.proxies = proxies
+        self.host = host
+        self.port = port
+        self.shard_size = max(1, shard_size)
+        self.timeout = timeout
+        self.depth = depth
+        self.view = view
+        self.lease = 3 * timeout + 10 if lease is None else lease
+        self.attempts = attempts
+        self.echo = echo
+
+        self.lock = threading.Condition()
+        self.pending = deque(
+            list(range(start, min(start + self.shard_size, len(proxies))))
+            for start in range(0, len(proxies), self.shard_size)
+        )
+        self.answered = [False] * len(proxies)
+        self.handed = [0] * len(proxies)  # Number of times each proxy was handed to a worker.
+        self.remaining = len(proxies)
+        self.closed = False
+
+        self.results = queue.Queue()
+        self.connections = set()
+
+        # Counters, for monitoring the run.
+        self.stats = {'workers': 0, 'lost': 0, 'shards': 0, 'requeued': 0, 'results': 0}
+
+        self.server = None
+
+    def __len__(self):
+        """Return the number of proxies to check."""
+        return len(self.proxies)
+
+    def __repr__(self):
+        """Return a representation of the Coordinator instance."""
+        return f"Coordinator {self.host}:{self.port} | Proxies: {len(self)} | Stats: {self.stats}"
+
+    def log(self, message: str, color: str = None) -> None:
+        """Print a message through the echo function, if one was given."""
+        if self.echo:
+            self.echo(message, color=color)
+
+    # Server: Start
+    def start(self) -> None:
+        """Listen for workers in a background thread."""
+
+        self.server = socket.create_server((self.host, self.port))
+        self.port = self.server.getsockname()[1]
+
+        threading.Thread(target=self.accept_workers, name='coordinator', daemon=True).start()
+        self.log(f'[Coordinator:] Listening on {self.host}:{self.port} ({len(self)} proxies, '
+                 f'{len(self.pending)} shards)', color='blue')
+
+    # Server: Close
+    def close(self) -> None:
+        """Stop accepting workers and disconnect the connected ones."""
+
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+            connections = list(self.connections)
+
+        if self.server is not None:
+            try:
+                self.server.shutdown(socket.SHUT_RDWR)  # Wakes up the blocked accept().
+            except OSError:
+                pass
+            self.server.close()
+
+        for sock in connections:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def accept_workers(self) -> None:
+        """Accept worker connections until the coordinator is closed."""
+
+        while True:
+            try:
+                sock, address = self.server.accept()
+            except OSError:
+                return  # The server socket was closed.
+
+            threading.Thread(target=self.serve_worker, args=(sock, address), daemon=True).start()
+
+    # Work: Shards
+    def next_shard(self) -> list | None:
+        """
+        Wait for a shard to hand out.
+
+        :return: List of proxy indexes, or None when there is no work left.
+        """
+
+        with self.lock:
+            while True:
+                if self.closed or not self.remaining:
+                    return None
+
+                while self.pending:
+                    shard = [index for index in self.pending.popleft() if not self.answered[index]]
+                    if shard:
+                        for index in shard:
+                            self.handed[index] += 1
+                        self.stats['shards'] += 1
+                        return shard
+
+                # Nothing queued, but shards in flight may still come back from a lost worker.
+                self.lock.wait()
+
+    def answer(self, index: int, result: dict) -> None:
+        """Accept the result of one proxy (the first answer wins) and hand it to the caller."""
+
+        with self.lock:
+            if not 0 <= index < len(self.answered) or self.answered[index]:
+                return
+            self.answered[index] = True
+            self.remaining -= 1
+            self.stats['results'] += 1
+            if not self.remaining:
+                self.lock.notify_all()
+
+        self.results.put((self.proxies[index], result))
+
+    def requeue(self, shard: list) -> None:
+        """Put the unanswered proxies of a lost worker's shard back in the queue."""
+
+        lost = []
+
+        with self.lock:
+            unanswered = [index for index in shard if not self.answered[index]]
+            retry = [index for index in unanswered if self.handed[index] < self.attempts]
+            lost = [index for index in unanswered if self.handed[index] >= self.attempts]
+
+            if retry:
+                self.pending.appendleft(retry)
+                self.stats['requeued'] += len(retry)
+                self.lock.notify_all()
+
+        # Proxies that keep taking their workers down are reported dead rather than handed out forever.
+        for index in lost:
+            proxy = self.proxies[index]
+            self.answer(index, {
+                'info': {'ip': proxy.get('ip', ''), 'port': proxy.get('port', ''), 'protocol': proxy.get('protocol', '')},
+                'alive': False,
+                'status_code': None,
+                'content': None,
+                'time': 0.0,
+                'error': f'Lost {self.attempts} workers while checking',
+            })
+
+    # Work: One worker
+    def serve_worker(self, sock: socket.socket, address: tuple) -> None:
+        """Hand shards to one worker and collect its results until there is no work left or it is lost."""
+
+        name = f'{address[0]}:{address[1]}'
+        shard = []
+        stream = sock.makefile('rb')
+
+        try:
+            sock.settimeout(self.lease)
+
+            hello = read_message(stream)
+            if hello['type'] != 'hello' or hello.get('protocol') != PROTOCOL:
+                raise DistributedError(f"Expected a '{PROTOCOL}' hello, got {hello}")
+            name = f"{hello.get('name') or 'worker'}@{name}"
+
+            with self.lock:
+                self.connections.add(sock)
+                self.stats['workers'] += 1
+            self.log(f'[Coordinator:] Worker {name} joined ({hello.get("workers", "?")} checks at once)', color='blue')
+
+            while True:
+                shard = self.next_shard() or []
+                if not shard:
+                    send_message(sock, {'type': 'bye'})
+                    return
+
+                send_message(sock, {
+                    'type': 'shard',
+                    'proxies': [[index, self.proxies[index]] for index in shard],
+                    'timeout': self.timeout,
+                    'depth': self.depth,
+                    'view': self.view,
+                })
+
+                # Collect the shard's results; a silent worker is dropped after the lease.
+                waiting = set(shard)
+                while waiting:
+                    message = read_message(stream)
+                    if message['type'] == 'result' and message.get('index') in waiting:
+                        if not isinstance(message['index'], int):
+                            raise DistributedError(f"Malformed result index: {message['index']!r}")
+                        result = check_result(message.get('result'))
+                        waiting.discard(message['index'])
+
+                        # The worker only reports the outcome: which proxy it was is the coordinator's to say,
+                        # so a worker cannot slip in an address that was never a candidate.
+                        proxy = self.proxies[message['index']]
+                        result = dict(result, info={'ip': proxy.get('ip', ''), 'port': proxy.get('port', ''),
+                                                    'protocol': proxy.get('protocol', '')})
+                        self.answer(message['index'], result)
+
+                shard = []
+
+        except (OSError, DistributedError, KeyError, TypeError) as e:
+            with self.lock:
+                closed = self.closed
+                self.stats['lost'] += 0 if closed else 1
+            if not closed:
+                unanswered = sum(not self.answered[index] for index in shard)
+                self.log(f'[Coordinator:] Worker {name} lost ({e}), requeueing {unanswered} proxies', color='yellow')
+
+        finally:
+            with self.lock:
+                self.connections.discard(sock)
+            self.requeue(shard)
+            stream.close()
+            sock.close()
+
+    # Results
+    def results_stream(self, deadline: float = None):
+        """
+        Yield the results as workers send them, until every proxy is answered or the deadline passes.
+
+        :param deadline: Stop after this many seconds (wall-clock). Default is None (no deadline).
+        :return: Generator of (proxy, result) tuples, like Toolkit.stream_the_proxies.
+        """
+
+        started = time.monotonic()
+        received = 0
+
+        while received < len(self.proxies):
+            remaining = None if deadline is None else deadline - (time.monotonic() - started)
+            if remaining is not None and remaining <= 0:
+                return
+
+            try:
+                # Wake up now and then, so the deadline is honoured even with no worker connected.
+                proxy, result = self.results.get(timeout=1 if remaining is None else min(1, remaining))
+            except queue.Empty:
+                continue
+
+            received += 1
+            yield proxy, result
+
+
+class Worker:
+    """
+    Worker Module.
+    Connects to a Coordinator, checks the shards it receives with a Toolkit and streams the results back.
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self, toolkit, host: str, port: int = 7700, workers: int = 16, name: str = None,
+                 connect_for: float = 30, echo=None):
+        """
+        Initialize the Worker class.
+
+        :param toolkit: Toolkit instance used for the checks (its view is set from each shard).
+        :param host: Address of the coordinator.
+        :param port: Port of the coordinator. Default is 7700.
+        :param workers: Number of concurrent checks. Default is 16.
+        :param name: Name reported to the coordinator. Default is the host name.
+        :param connect_for: Seconds to keep retrying while the coordinator is not up yet. Default is 30.
+        :param echo: Optional output function with the Toolkit.echo signature, for verbose logging.
+        """
+
+        self.toolkit = toolkit
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.name = name or socket.gethostname()
+        self.connect_for = connect_for
+        self.echo = echo
+
+        # Counters, for monitoring the worker.
+        self.stats = {'shards': 0, 'checked': 0, 'alive': 0}
+
+    def __repr__(self):
+        """Return a representation of the Worker instance."""
+        return f"Worker '{self.name}' -> {self.host}:{self.port} | Stats: {self.stats}"
+
+    def log(self, message: str, color: str = None) -> None:
+        """Print a message through the echo function, if one was given."""
+        if self.echo:
+            self.echo(message, color=color)
+
+    def connect(self) -> socket.socket:
+        """Connect to the coordinator, retrying until it is up or connect_for seconds have passed."""
+
+        started = time.monotonic()
+
+        while True:
+            try:
+                return socket.create_connection((self.host, self.port), timeout=10)
+            except OSError:
+                if time.monotonic() - started >= self.connect_for:
+                    raise
+                time.sleep(0.5)
+
+    # Work: Run
+    def run(self) -> dict:
+        """
+        Check shards until the coordinator says goodbye or goes away.
+
+        :return: The worker stats ('shards', 'checked', 'alive').
+        """
+
+        sock = self.connect()
+        sock.settimeout(None)  # Between shards the coordinator may stay quiet for long.
+        stream = sock.makefile('rb')
+
+        self.log(f'[Worker:] Connected to {self.host}:{self.port}', color='blue')
+
+        try:
+            send_message(sock, {'type': 'hello', 'protocol': PROTOCOL, 'name': self.name, 'workers': self.workers})
+
+            while True:
+                message = read_message(stream)
+
+                if message['type'] == 'bye':
+                    break
+
+                if message['type'] == 'shard':
+                    self.check_shard(sock, message)
+
+        except (OSError, DistributedError) as e:
+            self.log(f'[Worker:] Disconnected from the coordinator ({e})', color='yellow')
+
+        finally:
+            stream.close()
+            sock.close()
+
+        self.log(f"[Worker:] Done: {self.stats['checked']} checked, {self.stats['alive']} alive "
+                 f"in {self.stats['shards']} shards", color='blue')
+
+        return self.stats
+
+    def check_shard(self, sock: socket.socket, shard: dict) -> None:
+        """Check the proxies of one shard and send every result as soon as it is ready."""
+
+        self.toolkit.view = shard.get('view') or self.toolkit.view
+        indexes = {}  # id(proxy) -> index, as stream_the_proxies yields the proxy objects it was given.
+        proxies = []
+
+        for index, proxy in shard['proxies']:
+            indexes[id(proxy)] = index
+            proxies.append(proxy)
+
+        stream = self.toolkit.stream_the_proxies(proxies, workers=self.workers, timeout=shard.get('timeout', 9),
+                                                 depth=shard.get('depth', 'full'))
+
+        try:
+            for proxy, result in stream:
+                # The page itself stays here; only a preview travels back.
+                result = dict(result, content=result['content'][:125] if result.get('content') else result.get('content'))
+                send_message(sock, {'type': 'result', 'index': indexes[id(proxy)], 'result': result})
+
+                self.stats['checked'] += 1
+                self.stats['alive'] += bool(result['alive'])
+        finally:
+            stream.close()
+
+        self.stats['shards'] += 1
@@ -0,0 +1,516 @@
+import asyncio  # For serving many client connections at once.
+import socket  # For unpacking IP addresses in SOCKS requests.
+import struct  # For unpacking ports in SOCKS requests.
+import time  # For measuring upstream latency.
+from urllib.parse import urlsplit  # For splitting absolute-form HTTP request targets.
+import Probe  # For the proxy handshake messages shared with the checker.
+
+
+class GatewayError(Exception):
+    """Raised when an upstream proxy refuses or fails a tunnel."""
+
+
+class TargetRefused(GatewayError):
+    """Raised when an upstream proxy works but cannot reach the target ('code': SOCKS5 reply code, see Probe)."""
+
+    def __init__(self, message: str, code: int):
+        super().__init__(message)
+        self.code = code
+
+
+class Gateway:
+    """
+    Gateway Module.
+    A local rotating gateway that serves a validated proxy list to many consumers.
+
+    Clients connect with HTTP (CONNECT, or plain absolute-form requests) or SOCKS5 (no auth, CONNECT),
+    and every connection is tunnelled through the lowest-latency healthy upstream proxy.
+    Failed upstreams are put on a short, growing cooldown and the connection fails over to the next one.
+    A target that an upstream cannot reach is reported to the client as it is, without failover.
+    A few TCP connections to the best upstreams are kept warm, so most tunnels skip the TCP handshake.
+
+
+    Author: NightFox
+    Powered-by: Python3 asyncio
+    """
+
+    def __init__(self, proxies: list, host: str = '127.0.0.1', port: int = 8899, timeout: int = 9,
+                 attempts: int = 3, warm: int = 2, echo=None):
+        """
+        Initialize the Gateway class.
+
+        :param proxies: List of alive proxies (Toolkit.proxies), each with 'ip', 'port', 'protocol' and 'ping'.
+        :param host: Local address to listen on. Default is '127.0.0.1'.
+        :param port: Local port to listen on. Default is 8899.
+        :param timeout: Timeout in seconds for opening a tunnel through one upstream.
+        :param attempts: Number of upstreams to try per client connection before giving up.
+        :param warm: Number of idle connections to keep open to each of the best upstreams (0 disables it).
+        :param echo: Optional output function with the Toolkit.echo signature, for verbose logging.
+        """
+
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.attempts = attempts
+        self.warm = warm
+        self.echo = echo
+
+        # Upstream state: measured latency, consecutive failures, cooldown and warm idle connections.
+        self.upstreams = [
+            {
+                'ip': proxy['ip'],
+                'port': int(proxy['port']),
+                'protocol': str(proxy['protocol']).lower(),
+                'latency': float(proxy.get('ping') or timeout),
+                'failures': 0,
+                'down_until': 0.0,
+                'idle': [],
+            }
+            for proxy in proxies
+        ]
+
+        # Counters, for monitoring the gateway.
+        self.stats = {'connections': 0, 'tunnels': 0, 'failovers': 0, 'errors': 0, 'warm_hits': 0}
+
+        self.server = None
+        self.warmer = None  # Background task keeping the warm connections.
+
+    def __len__(self):
+        """Return the number of upstream proxies."""
+        return len(self.upstreams)
+
+    def __repr__(self):
+        """Return a representation of the Gateway instance."""
+        return f"Gateway {self.host}:{self.port} | Upstreams: {len(self)} | Stats: {self.stats}"
+
+    def log(self, message: str, color: str = None) -> None:
+        """Print a message through the echo function, if one was given."""
+        if self.echo:
+            self.echo(message, color=color)
+
+    # Serve
+    async def start(self) -> None:
+        """
+        Start listening for clients.
+
+        :return: None
+        """
+
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # In case port 0 (any free port) was asked for.
+        self.log(f'Gateway listening on {self.host}:{self.port} ({len(self)} upstreams)', color='green')
+
+        if self.warm:
+            self.warmer = asyncio.create_task(self.keep_warm())
+
+    async def serve_forever(self) -> None:
+        """
+        Start the gateway and serve clients until cancelled.
+
+        :return: None
+        """
+
+        await self.start()
+
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stop listening and close the warm connections.
+
+        :return: None
+        """
+
+        if self.warmer:
+            self.warmer.cancel()
+
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+        for upstream in self.upstreams:
+            for _, writer, _ in upstream['idle']:
+                writer.close()
+            upstream['idle'].clear()
+
+    # Routing
+    def ranked_upstreams(self) -> list:
+        """
+        Return the healthy upstreams, fastest first; fall back to the ones cooling down if none is healthy.
+
+        :return: List of upstream dictionaries.
+        """
+
+        now = time.monotonic()
+        healthy = [upstream for upstream in self.upstreams if upstream['down_until'] <= now]
+
+        return sorted(healthy or self.upstreams, key=lambda upstream: upstream['latency'])
+
+    def mark_success(self, upstream: dict, elapsed: float) -> None:
+        """Fold a tunnel setup time into the upstream latency and clear its failures."""
+        upstream['latency'] = 0.7 * upstream['latency'] + 0.3 * elapsed
+        upstream['failures'] = 0
+        upstream['down_until'] = 0.0
+
+    def mark_failure(self, upstream: dict) -> None:
+        """Put a failing upstream on a cooldown that doubles with every consecutive failure (capped at 5 min)."""
+        upstream['failures'] += 1
+        upstream['down_until'] = time.monotonic() + min(2 ** upstream['failures'], 300)
+
+        for _, writer, _ in upstream['idle']:
+            writer.close()
+        upstream['idle'].clear()
+
+    # Connections
+    async def connect_upstream(self, upstream: dict) -> tuple:
+        """
+        Get a TCP connection to the upstream proxy, reusing a warm one when available.
+
+        :param upstream: Upstream dictionary.
+        :return: (reader, writer) pair.
+        """
+
+        # Warm connections older than 20s are likely dropped by the proxy already.
+        while upstream['idle']:
+            reader, writer, opened = upstream['idle'].pop()
+            if time.monotonic() - opened < 20 and not reader.at_eof() and not writer.is_closing():
+                self.stats['warm_hits'] += 1
+                return reader, writer
+            writer.close()
+
+        return await asyncio.wait_for(
+            asyncio.open_connection(upstream['ip'], upstream['port']), timeout=self.timeout
+        )
+
+    async def keep_warm(self) -> None:
+        """
+        Keep a few idle connections open to the fastest upstreams, refreshing them in the background.
+
+        :return: None
+        """
+
+        while self.server and self.server.is_serving():
+            for upstream in self.ranked_upstreams()[:4]:
+                # Drop stale connections, then top the pool back up.
+                now = time.monotonic()
+                fresh = []
+                for reader, writer, opened in upstream['idle']:
+                    if now - opened < 20 and not reader.at_eof() and not writer.is_closing():
+                        fresh.append((reader, writer, opened))
+                    else:
+                        writer.close()
+                upstream['idle'] = fresh
+
+                while len(upstream['idle']) < self.warm:
+                    try:
+                        reader, writer = await asyncio.wait_for(
+                            asyncio.open_connection(upstream['ip'], upstream['port']), timeout=self.timeout
+                        )
+                    except (OSError, asyncio.TimeoutError):
+                        self.mark_failure(upstream)
+                        break
+                    upstream['idle'].append((reader, writer, time.monotonic()))
+
+            await asyncio.sleep(5)
+
+    async def open_tunnel(self, host: str, port: int) -> tuple:
+        """
+        Open a tunnel to host:port, trying upstreams fastest first and failing over on errors.
+
+        Connect errors, timeouts and protocol errors count against the upstream. A target the upstream cannot
+        reach (TargetRefused) does not: it is raised to the client at once, without failover.
+
+        :param host: Target hostname or IP address.
+        :param port: Target port.
+        :return: (reader, writer) pair of the established tunnel.
+        :raises TargetRefused: If the upstream cannot reach the target.
+        :raises GatewayError: If no upstream could open the tunnel.
+        """
+
+        error = None
+
+        for flag, upstream in enumerate(self.ranked_upstreams()[:self.attempts]):
+            if flag:
+                self.stats['failovers'] += 1
+
+            timer = time.monotonic()
+            writer = None
+
+            try:
+                reader, writer = await self.connect_upstream(upstream)
+                await asyncio.wait_for(
+                    handshake(reader, writer, upstream['protocol'], host, port), timeout=self.timeout
+                )
+                self.mark_success(upstream, time.monotonic() - timer)
+                self.stats['tunnels'] += 1
+                return reader, writer
+
+            except TargetRefused as e:
+                # The upstream did its job: the target is down, and would be through any other upstream too.
+                self.log(f"[Error:] Upstream {upstream['protocol']}://{upstream['ip']}:{upstream['port']} "
+                         f"cannot reach {host}:{port}: {e}", color='red')
+                writer.close()
+                raise
+
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, GatewayError) as e:
+                error = e
+                self.mark_failure(upstream)
+                self.log(f"[Error:] Upstream {upstream['protocol']}://{upstream['ip']}:{upstream['port']} "
+                         f"failed: {e!r}", color='red')
+                if writer:
+                    writer.close()
+
+        raise GatewayError(f'No upstream could reach {host}:{port} ({error!r})')
+
+    # Clients
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve one client connection: detect SOCKS5 or HTTP, open a tunnel and relay the traffic.
+
+        :param reader: Client stream reader.
+        :param writer: Client stream writer.
+        :return: None
+        """
+
+        self.stats['connections'] += 1
+
+        try:
+            first = await asyncio.wait_for(reader.readexactly(1), timeout=self.timeout)
+
+            if first == b'\x05':
+                upstream = await self.serve_socks5(reader, writer)
+            else:
+                upstream = await self.serve_http(first, reader, writer)
+
+            if upstream:
+                await relay(reader, writer, *upstream)
+
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, GatewayError, ValueError) as e:
+            self.stats['errors'] += 1
+            self.log(f'[Error:] Client connection: {e!r}', color='red')
+
+        finally:
+            writer.close()
+
+    async def serve_socks5(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> tuple | None:
+        """
+        Run the server side of a SOCKS5 (no auth, CONNECT) handshake and open the tunnel.
+
+        :return: (reader, writer) pair of the tunnel, or None if the client was refused.
+        """
+
+        methods = await reader.readexactly((await reader.readexactly(1))[0])
+        if 0 not in methods:
+            writer.write(b'\x05\xff')  # No acceptable authentication method.
+            await writer.drain()
+            return None
+
+        writer.write(b'\x05\x00')
+        await writer.drain()
+
+        version, command, _, address_type = await reader.readexactly(4)
+        if address_type == 1:
+            host = socket.inet_ntop(socket.AF_INET, await reader.readexactly(4))
+        elif address_type == 4:
+            host = socket.inet_ntop(socket.AF_INET6, await reader.readexactly(16))
+        elif address_type == 3:
+            host = (await reader.readexactly((await reader.readexactly(1))[0])).decode('idna')
+        else:
+            writer.write(b'\x05\x08\x00\x01' + bytes(6))  # Address type not supported.
+            await writer.drain()
+            return None
+        port = struct.unpack('!H', await reader.readexactly(2))[0]
+
+        if command != 1:
+            writer.write(b'\x05\x07\x00\x01' + bytes(6))  # Command not supported.
+            await writer.drain()
+            return None
+
+        try:
+            upstream = await self.open_tunnel(host, port)
+        except TargetRefused as e:
+            writer.write(bytes([5, e.code, 0, 1]) + bytes(6))  # The upstream's own reply (refused, unreachable).
+            await writer.drain()
+            raise
+        except GatewayError:
+            writer.write(b'\x05\x01\x00\x01' + bytes(6))  # General failure.
+            await writer.drain()
+            raise
+
+        writer.write(b'\x05\x00\x00\x01' + bytes(6))
+        await writer.drain()
+        return upstream
+
+    async def serve_http(self, first: bytes, reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter) -> tuple | None:
+        """
+        Serve an HTTP proxy request: CONNECT tunnels, or absolute-form requests forwarded through a tunnel.
+
+        An absolute-form request is sent with 'Connection: close', so the connection ends with its response:
+        a keep-alive client cannot send its next request (maybe for another host) down the same tunnel.
+
+        :return: (reader, writer) pair of the tunnel, or None if the client was refused.
+        """
+
+        head = first + await reader.readuntil(b'\r\n\r\n')
+        request_line, _, headers = head.partition(b'\r\n')
+        method, target, version = request_line.decode('latin-1').split(' ', 2)
+
+        if method.upper() == 'CONNECT':
+            host, port = split_host_port(target, default_port=443)
+            upstream = await self.open_http_tunnel(host, port, writer)
+            writer.write(b'HTTP/1.1 200 Connection established\r\n\r\n')
+            await writer.drain()
+            return upstream
+
+        url = urlsplit(target)
+        if url.scheme != 'http' or not url.hostname:
+            writer.write(b'HTTP/1.1 400 Bad Request\r\nConnection: close\r\n\r\n')
+            await writer.drain()
+            return None
+
+        upstream = await self.open_http_tunnel(url.hostname, url.port or 80, writer)
+
+        # Rewrite to origin-form, drop the hop-by-hop headers and close the connection after this response.
+        path = url.path or '/'
+        if url.query:
+            path += f'?{url.query}'
+        lines = [line for line in headers.split(b'\r\n') if line]
+        hop = {b'connection', b'keep-alive'}
+        for line in lines:
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'connection':
+                hop.update(token.strip().lower() for token in value.split(b','))
+        kept = [line for line in lines if line.partition(b':')[0].strip().lower() not in hop
+                and not line.lower().startswith(b'proxy-')]
+        upstream[1].write(f'{method} {path} {version}\r\n'.encode('latin-1')
+                          + b''.join(line + b'\r\n' for line in kept) + b'Connection: close\r\n\r\n')
+        await upstream[1].drain()
+        return upstream
+
+    async def open_http_tunnel(self, host: str, port: int, writer: asyncio.StreamWriter) -> tuple:
+        """
+        Open a tunnel for an HTTP client, answering '504 Gateway Timeout' (unreachable target)
+        or '502 Bad Gateway' (anything else) when it cannot be opened.
+
+        :return: (reader, writer) pair of the tunnel.
+        """
+
+        try:
+            return await self.open_tunnel(host, port)
+        except GatewayError as e:
+            status = b'504 Gateway Timeout' if getattr(e, 'code', None) in (0x03, 0x04) else b'502 Bad Gateway'
+            writer.write(b'HTTP/1.1 ' + status + b'\r\nConnection: close\r\n\r\n')
+            await writer.drain()
+            raise
+
+    # Toolkit: Run
+    def run(self) -> None:
+        """
+        Serve clients until interrupted (Ctrl+C).
+
+        :return: None
+        """
+
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            self.log(f'Gateway stopped | {self.stats}', color='blue')
+
+
+def split_host_port(target: str, default_port: int) -> tuple:
+    """
+    Split 'host:port' (IPv6 in brackets) into a (host, port) tuple.
+
+    :param target: The 'host:port' string.
+    :param default_port: Port used when the target has none.
+    :return: (host, port) tuple.
+    """
+
+    if target.startswith('['):
+        host, _, rest = target[1:].partition(']')
+        return host, int(rest.lstrip(':') or default_port)
+
+    host, _, port = target.rpartition(':')
+    if not host or ':' in host:
+        return target, default_port
+
+    return host, int(port)
+
+
+async def handshake(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, protocol: str,
+                    host: str, port: int) -> None:
+    """
+    Ask an upstream proxy for a tunnel to host:port over an already open connection.
+    The messages are the same as the checker's (see Probe), sent over asyncio streams.
+
+    :param reader: Upstream stream reader.
+    :param writer: Upstream stream writer.
+    :param protocol: Upstream protocol ('http', 'https', 'socks4' or 'socks5').
+    :param host: Target hostname or IP address.
+    :param port: Target port.
+    :return: None (raises GatewayError if the upstream refuses, TargetRefused if it cannot reach the target).
+    """
+
+    try:
+        if protocol in ('http', 'https'):
+            writer.write(Probe.connect_request(host, port))
+            await writer.drain()
+            Probe.check_connect_reply(await reader.readuntil(b'\r\n\r\n'))
+
+        elif protocol == 'socks4':
+            writer.write(Probe.socks4_request(host, port))
+            await writer.drain()
+            Probe.check_socks4_reply(await reader.readexactly(8))
+
+        elif protocol == 'socks5':
+            writer.write(Probe.SOCKS5_GREETING)
+            await writer.drain()
+
+            if await reader.readexactly(2) != b'\x05\x00':
+                raise GatewayError('SOCKS5 proxy requires authentication')
+
+            writer.write(Probe.socks5_request(host, port))
+            await writer.drain()
+
+            # Skip the bound address in the reply.
+            await reader.readexactly(Probe.socks5_reply_length(await reader.readexactly(5)))
+
+        else:
+            raise GatewayError(f'Unsupported upstream protocol: {protocol}')
+
+    except Probe.TargetRefused as e:
+        raise TargetRefused(str(e), e.code) from e
+    except Probe.ProbeError as e:
+        raise GatewayError(str(e)) from e
+
+
+async def relay(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter,
+                upstream_reader: asyncio.StreamReader, upstream_writer: asyncio.StreamWriter) -> None:
+    """
+    Copy bytes both ways between the client and the upstream tunnel.
+
+    When the client is done sending, only its direction is half-closed (write_eof), so the response still
+    comes back. When the upstream is done, the relay ends and both connections are closed.
+
+    :return: None
+    """
+
+    async def pipe(reader, writer):
+        try:
+            while chunk := await reader.read(65536):
+                writer.write(chunk)
+                await writer.drain()
+            if writer.can_write_eof():
+                writer.write_eof()
+        except OSError:
+            pass
+
+    upload = asyncio.ensure_future(pipe(client_reader, upstream_writer))
+    try:
+        await pipe(upstream_reader, client_writer)
+    finally:
+        upload.cancel()
+        upstream_writer.close()
+        client_writer.close()
@@ -1,4 +1,10 @@
-from Toolkit import requests, json, Art, Toolkit
+from Toolkit import requests, json, Art, Toolkit, LazyModule
+import threading  # For refreshing stale cache entries in the background.
+import Retry  # For retrying API requests and circuit breaking the endpoint.
+
+# Imported on first use only.
+Cache = LazyModule('Cache')  # For caching API responses on disk.
+Records = LazyModule('Records')  # For keeping the full Geonode records in compact typed columns.
 
 
 class Geonode(Toolkit):
@@ -39,6 +45,10 @@ class Geonode(Toolkit):
             - 4[/4]. Save(any data, list or dict) as json.
         """
         super().__init__()
+        self.cache = None  # Cache.ResponseCache for API responses (see enable_cache).
+        self.api_timeout = 30  # Timeout in seconds of one API request.
+        self.api_retry = Retry.RetryPolicy(attempts=4, base=1.0, cap=16.0)  # Backoff for transient API errors.
+        self.api_breaker = Retry.CircuitBreaker(threshold=5, reset_timeout=60)  # Stops hammering a failing API.
         Art.default_logo = Art.geonode_logo  # New Art for "check_the_proxies()" from Toolkit class
 
     def __repr__(self):
@@ -135,27 +145,70 @@ class Geonode(Toolkit):
         self.echo(f'[URL:] {complete_url}', end='\n')
         return complete_url
 
+    # Cache API responses
+    def enable_cache(self, path: str = 'geonode_cache', ttl: int = 600, offline: bool = False) -> None:
+        """
+        Cache API responses on disk, keyed by the API url.
+
+        - Inside the TTL, fetch_api serves the cached response without any request.
+        - After the TTL, fetch_api serves the stale response right away and refreshes it in the background
+          with a conditional request (If-None-Match / If-Modified-Since).
+        - Offline, fetch_api only replays cached responses, whatever their age, and never touches the network.
+
+        :param path: Directory where the responses are stored. Default is 'geonode_cache'.
+        :param ttl: Time-to-live of a cached response in seconds. Default is 600 (10 minutes).
+        :param offline: Boolean flag to replay cached responses only. Default is False.
+        :return: None
+        """
+
+        self.echo(f'Response cache ({path}):', end=' ')
+
+        try:
+            self.cache = Cache.ResponseCache(path=path, ttl=ttl, offline=offline)
+            self.echo(f'{len(self.cache)} entries', color='green', bgcolor='darkgray', end='\n')
+
+        except Exception as e:
+            self.echo('Unsuccessful', color='red', bgcolor='darkgray', end='\n')
+            self.echo(f"[Error:] Opening cache '{path}'\n{e}", color="red")
+
     # Get DATA from web
     def fetch_api(self, api_url: str) -> dict:
         """
         Send a request to the provided URL and return the response data.
+        Uses the response cache when enabled (see enable_cache).
 
         :param api_url: The URL to fetch the data from.
         :return: A dictionary containing the response data or an error message.
         """
         self.echo(f'Fetch API:', end=' ')
 
-        try:
-            # Send a GET request to the specified URL
-            response = requests.get(api_url)
+        if self.cache is not None:
+            entry = self.cache.load(api_url)
 
-            # Raise an exception if the request was unsuccessful
-            response.raise_for_status()
+            if entry is not None and (self.cache.offline or self.cache.is_fresh(entry)):
+                # Fresh (or offline replay): no request at all.
+                self.echo('Cached', color='green', bgcolor='darkgray', end='\n')
+                return entry['data']
+
+            if entry is not None:
+                # Stale: serve it now, refresh it in the background.
+                if self.cache.claim_refresh(api_url):
+                    threading.Thread(target=self.refresh_api, args=(api_url, True), daemon=True).start()
+                self.echo('Cached (refreshing)', color='green', bgcolor='darkgray', end='\n')
+                return entry['data']
+
+            if self.cache.offline:
+                self.echo('Unsuccessful', color='red', bgcolor='darkgray', end='\n')
+                self.echo(f"[Error:] not cached (offline): '{api_url}'")
+                return {"error": "Not cached (offline mode)"}
+
+        try:
+            data = self.refresh_api(api_url)
 
             self.echo('Successful', color='green', bgcolor='darkgray', end='\n')
 
             # Return the response data in JSON format
-            return response.json()
+            return data
 
         except requests.exceptions.RequestException as e:
             # Handle any exceptions that occur during the request
@@ -164,6 +217,102 @@ class Geonode(Toolkit):
 
             return {"error": str(e)}
 
+    # Refresh DATA from web
+    def refresh_api(self, api_url: str, background: bool = False) -> dict | None:
+        """
+        Request the API url and store the response in the cache (when enabled).
+        A cached response is revalidated with a conditional request, and a '304 Not Modified' only renews it.
+
+        :param api_url: The URL to fetch the data from.
+        :param background: Boolean flag for background refreshes: errors are reported, not raised,
+                           and the refresh claim is released at the end.
+        :return: The response data in JSON format (None for a failed background refresh).
+        """
+
+        entry = self.cache.load(api_url) if self.cache is not None else None
+
+        try:
+            # Refuse right away while the endpoint keeps failing
+            if not self.api_breaker.allow():
+                raise requests.exceptions.RequestException('Circuit breaker open: the API keeps failing, try later')
+
+            try:
+                # Send a GET request to the specified URL, retrying transient errors with backoff
+                response = self.api_retry.run(
+                    lambda: requests.get(api_url, headers=Cache.ResponseCache.validators(entry),
+                                         timeout=self.api_timeout),
+                    retry_if=self.is_transient,
+                    success_if=lambda result: result.status_code < 400,
+                    wait_hint=lambda result, error: self.retry_after(result),
+                )
+
+            except Exception as e:
+                # Every half-open trial must end in a success or a failure, or the breaker never closes again.
+                if self.is_transient(None, e) or self.api_breaker.trial:
+                    self.api_breaker.failure()
+                raise
+
+            if self.is_transient(response, None):
+                self.api_breaker.failure()
+            else:
+                self.api_breaker.success()
+
+            if response.status_code == 304 and entry is not None:
+                # Not modified: the cached data is still current.
+                self.cache.touch(api_url)
+                return entry['data']
+
+            # Raise an exception if the request was unsuccessful
+            response.raise_for_status()
+
+            data = response.json()
+
+            if self.cache is not None:
+                self.cache.store(api_url, data, etag=response.headers.get('ETag'),
+                                 last_modified=response.headers.get('Last-Modified'))
+
+            return data
+
+        except requests.exceptions.RequestException as e:
+            if not background:
+                raise
+
+            self.echo(f"[Error:] refreshing cache from: '{api_url}'\n{e}", color='red')
+            return None
+
+        finally:
+            if background:
+                self.cache.release_refresh(api_url)
+
+    # Retry: Transient API errors
+    @staticmethod
+    def is_transient(response, error) -> bool:
+        """
+        Check whether an API request outcome is a transient failure, worth a retry.
+
+        :param response: The response (None if the request raised).
+        :param error: The exception raised by the request, or None.
+        :return: True for connection errors, timeouts, '429 Too Many Requests' and 5xx responses.
+        """
+
+        if error is not None:
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+        return response.status_code == 429 or response.status_code >= 500
+
+    # Retry: Server hint
+    @staticmethod
+    def retry_after(response) -> float | None:
+        """
+        Read the delay asked by the server in a 'Retry-After' header (seconds form only).
+
+        :param response: The response, or None.
+        :return: The delay in seconds, or None.
+        """
+
+        value = response.headers.get('Retry-After', '') if response is not None else ''
+        return float(value) if value.strip().isdigit() else None
+
     # Read DATA from files that created manually
     def read_api(self, path: str) -> dict:
         """
@@ -189,11 +338,14 @@ class Geonode(Toolkit):
             return {"error": str(e)}
 
     # Turn DATA to list of pure proxies ('ip', 'port', 'protocol' only)
-    def export_proxies(self, data: dict) -> list:
+    def export_proxies(self, data: dict, prefilter: bool = True, metadata: bool = False) -> list:
         """
         Extract a list of proxies from the provided data.
 
         :param data: Dictionary containing the original GeoNode API data.
+        :param prefilter: Boolean flag to drop invalid and reserved proxies right away. Default is True.
+        :param metadata: Boolean flag to also keep 'upTime', 'speed', 'lastChecked' and 'responseTime',
+                         used by schedule_the_proxies to check the most promising proxies first. Default is False.
         :return: List of proxies with 'ip', 'port', and 'protocol' information.
         """
         # Proxy Storage
@@ -213,6 +365,11 @@ class Geonode(Toolkit):
                     'protocol': protocol[0]
                 }
 
+                if metadata:
+                    # Keep the ranking fields; 'lastChecked' is a Unix timestamp (seconds).
+                    for key in ('upTime', 'speed', 'lastChecked', 'responseTime'):
+                        extract[key] = proxy.get(key)
+
                 proxies_list.append(extract)
 
             except Exception as e:
@@ -220,9 +377,60 @@ class Geonode(Toolkit):
                 continue
 
         self.echo('Done', color='green', bgcolor='darkgray', end='\n')
+
+        # Drop the proxies that can never pass the check.
+        if prefilter:
+            proxies_list = self.filter_proxies(proxies_list)
+
         # Return the list
         return proxies_list
 
+    # Turn DATA to a typed table with every Geonode field
+    def export_records(self, data: dict, prefilter: bool = True) -> 'Records.ProxyTable':
+        """
+        Extract every field of the provided data into a compact, typed, column-oriented table.
+        Unlike export_proxies, nothing is dropped: all protocols, country, anonymity, uptime, response time,
+        last-checked... The table can then be filtered and sorted in memory, and turned into a standard list:
+
+            table = tools.export_records(data)
+            fast = table.filter(country='DE', min_up_time=90).sort_by('response_time')
+            tools.schedule_the_proxies(fast.to_list(), target=50)
+
+        :param data: Dictionary containing the original GeoNode API data.
+        :param prefilter: Boolean flag to drop invalid and reserved proxies right away. Default is True.
+        :return: Records.ProxyTable of the proxies.
+        """
+        table = Records.ProxyTable()
+
+        self.echo(f'Records exporting:', end=' ')
+
+        for proxy in data['data']:  # GeoNode API Data
+            try:
+                table.append(proxy)
+
+            except Exception as e:
+                self.echo(f"[Error:] reading proxy information from JSON file: {e}", color='red')
+                continue
+
+        self.echo('Done', color='green', bgcolor='darkgray', end='\n')
+
+        # Drop the proxies that can never pass the check (judged on ip, port and first protocol).
+        # One entry per row, so the reasons stay aligned with the table (no known protocol: rejected).
+        if prefilter:
+            columns = table.columns
+            rows = []
+            for flag in range(len(table)):
+                names = Records.protocol_names(columns['protocols'][flag])
+                rows.append({'ip': columns['ip'][flag], 'port': str(columns['port'][flag]),
+                             'protocol': names[0] if names else ''})
+
+            reasons = self.classify_proxies(rows)
+            table = table.select(flag for flag, reason in enumerate(reasons) if reason is None)
+            self.echo(f'Pre-filter: {len(table)} kept, {len(reasons) - len(table)} rejected')
+
+        # Return the table
+        return table
+
     # Cut pure proxies ('ip', 'port', 'protocol' only) from standard lists
     def cut_proxy(self, proxies: list) -> list:
         """
@@ -277,17 +485,43 @@ class Geonode(Toolkit):
                 import_standard_txt
                 import_standard_json
 
+            # Filter proxies | Networks
+                classify_proxies
+                filter_proxies
+                load_blocklist
+                load_allowlist
+                load_asn_map
+                block_asns
+
             # Check proxy | Core functions
                 check_socks_proxy
                 check_http_proxy
+                probe_the_proxy
 
             # Handle the proxy checking
                 present_the_proxy
+                format_phases
                 add_the_proxy
                 check_the_proxy
 
             # Prime function
                 check_the_proxies
+                priority_scores
+                prime_the_view
+                stream_the_proxies
+                schedule_the_proxies
+                gather_the_proxies
+
+            # History of checks
+                open_history
+                order_by_history
+
+            # Serve the proxies
+                serve_gateway
+
+            # Check across many nodes
+                coordinate_the_proxies
+                serve_as_worker
 
         - Geonode Version
 
@@ -296,11 +530,16 @@ class Geonode(Toolkit):
 
             # Handle Geonode API
                 generate_url
+                enable_cache
                 fetch_api
+                refresh_api
+                is_transient
+                retry_after
                 read_api
 
             # Export proxies from data
                 export_proxies
+                export_records
 
             # Cut only proxies (ip, port, protocol) from data
                 cut_proxy
@@ -0,0 +1,209 @@
+import math  # For nearest-rank percentiles.
+import sqlite3  # For the embedded history database.
+import threading  # For sharing one connection between checker threads.
+import time  # For check timestamps and query windows.
+
+
+class History:
+    """
+    History Module.
+    A local SQLite store of every proxy check outcome, for reliability and latency queries over time.
+
+    Each check is one row (ip, port, protocol, alive, latency, checked). Rows are indexed on
+    (ip, port, checked) for per-proxy queries and on (checked) for window-wide queries.
+
+
+    Author: NightFox
+    Powered-by: Python3 and SQLite
+    """
+
+    def __init__(self, path: str = 'proxy_history.db'):
+        """
+        Initialize the History class and create the schema if needed.
+
+        :param path: Path of the SQLite database file (':memory:' for a throwaway store).
+        """
+
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self.lock, self.connection:
+            # WAL keeps readers and the writer out of each other's way and makes small commits cheap.
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS checks ('
+                ' ip TEXT NOT NULL,'
+                ' port INTEGER NOT NULL,'
+                ' protocol TEXT NOT NULL,'
+                ' alive INTEGER NOT NULL,'
+                ' latency REAL,'
+                ' checked REAL NOT NULL)'
+            )
+            self.connection.execute('CREATE INDEX IF NOT EXISTS checks_proxy ON checks (ip, port, checked)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS checks_time ON checks (checked)')
+
+    def __len__(self):
+        """Return the number of recorded checks."""
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM checks').fetchone()[0]
+
+    def __repr__(self):
+        """Return a representation of the History instance."""
+        return f"History '{self.path}' | Checks: {len(self)}"
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.connection.close()
+
+    # Record: Check
+    def record(self, response: dict, checked: float = None) -> None:
+        """
+        Record the outcome of one proxy check.
+
+        :param response: Check result dictionary (as returned by Toolkit.check_the_proxy).
+        :param checked: Timestamp of the check (default: now).
+        :return: None
+        """
+
+        self.record_many([response], checked=checked)
+
+    # Record: Many checks
+    def record_many(self, responses: list, checked: float = None) -> None:
+        """
+        Record the outcome of many proxy checks in one transaction.
+
+        :param responses: List of check result dictionaries.
+        :param checked: Timestamp of the checks (default: now).
+        :return: None
+        """
+
+        checked = time.time() if checked is None else checked
+        rows = [
+            (
+                str(response['info']['ip']),
+                int(response['info']['port']),
+                str(response['info']['protocol']).lower(),
+                1 if response['alive'] else 0,
+                response['time'] if response['alive'] else None,
+                checked,
+            )
+            for response in responses
+        ]
+
+        with self.lock, self.connection:
+            self.connection.executemany('INSERT INTO checks VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    # Query: Uptime
+    def uptime(self, ip: str, port: int, since: float = 86400) -> float | None:
+        """
+        Return the share of successful checks of a proxy over a time window.
+
+        :param ip: IP address of the proxy.
+        :param port: Port number of the proxy.
+        :param since: Window length in seconds, counted back from now. Default is 24 hours.
+        :return: Uptime between 0.0 and 1.0, or None if the proxy was not checked in the window.
+        """
+
+        with self.lock:
+            checks, successes = self.connection.execute(
+                'SELECT COUNT(*), SUM(alive) FROM checks WHERE ip = ? AND port = ? AND checked >= ?',
+                (str(ip), int(port), time.time() - since),
+            ).fetchone()
+
+        return successes / checks if checks else None
+
+    # Query: Latency percentile
+    def latency(self, ip: str, port: int, percentile: float = 90, since: float = 86400) -> float | None:
+        """
+        Return a latency percentile of a proxy's successful checks over a time window (nearest rank).
+
+        :param ip: IP address of the proxy.
+        :param port: Port number of the proxy.
+        :param percentile: Percentile between 0 and 100. Default is 90.
+        :param since: Window length in seconds, counted back from now. Default is 24 hours.
+        :return: Latency in seconds, or None if the proxy had no successful check in the window.
+        """
+
+        window = (str(ip), int(port), time.time() - since)
+
+        with self.lock:
+            count = self.connection.execute(
+                'SELECT COUNT(*) FROM checks WHERE ip = ? AND port = ? AND checked >= ? AND alive = 1', window
+            ).fetchone()[0]
+
+            if not count:
+                return None
+
+            rank = max(math.ceil(percentile / 100 * count), 1)
+            return self.connection.execute(
+                'SELECT latency FROM checks WHERE ip = ? AND port = ? AND checked >= ? AND alive = 1'
+                ' ORDER BY latency LIMIT 1 OFFSET ?', window + (rank - 1,)
+            ).fetchone()[0]
+
+    # Query: Summary of every proxy
+    def summary(self, since: float = 86400) -> dict:
+        """
+        Return per-proxy check counts over a time window, in a single grouped query.
+
+        :param since: Window length in seconds, counted back from now. Default is 24 hours.
+        :return: Dictionary {(ip, port): {'protocol', 'checks', 'successes', 'uptime', 'latency'}},
+                 where 'latency' is the mean latency of the successful checks.
+        """
+
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT ip, port, MAX(protocol), COUNT(*), SUM(alive), AVG(latency) FROM checks'
+                ' WHERE checked >= ? GROUP BY ip, port', (time.time() - since,)
+            ).fetchall()
+
+        return {
+            (ip, port): {
+                'protocol': protocol,
+                'checks': checks,
+                'successes': successes,
+                'uptime': successes / checks,
+                'latency': latency,
+            }
+            for ip, port, protocol, checks, successes, latency in rows
+        }
+
+    # Query: Top proxies
+    def top(self, n: int = 10, since: float = 86400, min_checks: int = 3) -> list:
+        """
+        Return the N most reliable proxies over a time window: highest uptime first, then lowest mean latency.
+
+        :param n: Number of proxies to return. Default is 10.
+        :param since: Window length in seconds, counted back from now. Default is 24 hours.
+        :param min_checks: Minimum number of checks in the window to be ranked. Default is 3.
+        :return: List of dictionaries with 'ip', 'port', 'protocol', 'checks', 'uptime' and 'latency'.
+        """
+
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT ip, port, MAX(protocol), COUNT(*) AS checks, AVG(alive) AS uptime, AVG(latency) AS latency'
+                ' FROM checks WHERE checked >= ? GROUP BY ip, port HAVING checks >= ?'
+                ' ORDER BY uptime DESC, latency IS NULL, latency ASC LIMIT ?',
+                (time.time() - since, min_checks, n),
+            ).fetchall()
+
+        return [
+            {'ip': ip, 'port': port, 'protocol': protocol, 'checks': checks, 'uptime': uptime, 'latency': latency}
+            for ip, port, protocol, checks, uptime, latency in rows
+        ]
+
+    # Maintenance: Prune
+    def prune(self, older_than: float = 30 * 86400) -> int:
+        """
+        Delete the checks older than a given age.
+
+        :param older_than: Age in seconds. Default is 30 days.
+        :return: Number of deleted checks.
+        """
+
+        with self.lock, self.connection:
+            return self.connection.execute(
+                'DELETE FROM checks WHERE checked < ?', (time.time() - older_than,)
+            ).rowcount
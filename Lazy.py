@@ -0,0 +1,56 @@
+import importlib  # For importing modules on first use.
+import threading  # For importing each module only once, even from checker threads.
+
+
+class LazyModule:
+    """
+    LazyModule Module.
+    A stand-in for a module that is only imported the first time one of its attributes is used.
+
+    Heavy dependencies (requests, asyncio, sqlite3...) then cost nothing for the runs that never use them:
+
+        requests = LazyModule('requests')  # Nothing imported yet.
+        requests.get(url)                  # 'requests' is imported here, once.
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the LazyModule class.
+
+        :param name: Full name of the module to import on first use (e.g. 'concurrent.futures').
+        """
+
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def __repr__(self):
+        """Return a representation of the LazyModule instance."""
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule '{self._name}' ({state})>"
+
+    def __getattr__(self, attribute: str):
+        """Import the module if needed, then return the attribute from it."""
+        return getattr(self.load(), attribute)
+
+    def __setattr__(self, attribute: str, value) -> None:
+        """Set the attribute on the real module (e.g. for monkey patching in user code)."""
+        setattr(self.load(), attribute, value)
+
+    def load(self):
+        """
+        Import the module (only the first time) and return it.
+
+        :return: The real module.
+        """
+
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self.__dict__['_module'] = importlib.import_module(self._name)
+
+        return self._module
@@ -0,0 +1,506 @@
+import heapq  # For re-queueing the split parts of partially overlapping ranges in order.
+import socket  # For packing IPv4/IPv6 addresses into integers.
+from bisect import bisect_right  # For binary search over the packed ranges.
+
+
+class NetworkIndex:
+    """
+    NetworkIndex Module.
+    An interval index of IPv4/IPv6 networks, packed as sorted integer ranges.
+
+    Networks are added as CIDRs (or raw integer ranges) with an optional label, then compiled into
+    flat, non-overlapping ranges so every lookup is a single binary search. Nested networks are
+    flattened so the most specific network wins (e.g. a /24 inside a /8 keeps its own label).
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self, networks: list = None, label: str = 'blocked'):
+        """
+        Initialize the NetworkIndex class.
+
+        :param networks: Optional list of CIDR strings to add right away.
+        :param label: Label stored for the networks given in 'networks'.
+        """
+
+        self.pending = {4: [], 6: []}  # Raw (start, end, label) ranges, per IP version.
+        self.starts = {4: [], 6: []}  # Compiled range starts, per IP version.
+        self.ends = {4: [], 6: []}  # Compiled range ends, per IP version.
+        self.labels = {4: [], 6: []}  # Compiled range labels, per IP version.
+        self.compiled = True  # False while there are ranges waiting to be compiled.
+
+        for network in networks or []:
+            self.add(network, label=label)
+
+    def __len__(self):
+        """Return the number of compiled ranges in the index."""
+        self.compile()
+        return len(self.starts[4]) + len(self.starts[6])
+
+    def __contains__(self, ip):
+        """Return True if the IP address falls inside any indexed network."""
+        return self.lookup(ip) is not None
+
+    # Add: CIDR
+    def add(self, network: str, label: str = 'blocked') -> None:
+        """
+        Add a network in CIDR notation ('10.0.0.0/8', '2001:db8::/32') or a single address.
+
+        :param network: Network in CIDR notation, or a bare IP address (treated as /32 or /128).
+        :param label: Label returned by lookups that match this network.
+        :return: None
+        """
+
+        address, _, prefix = network.strip().partition('/')
+        packed = parse_ip(address)
+
+        if packed is None:
+            raise ValueError(f"Invalid network address: '{network}'")
+
+        version, value = packed
+        bits = 32 if version == 4 else 128
+        prefix = int(prefix) if prefix else bits
+
+        if not 0 <= prefix <= bits:
+            raise ValueError(f"Invalid network prefix: '{network}'")
+
+        # Mask the host bits so '10.1.2.3/8' still covers the whole 10.0.0.0/8 network.
+        host_bits = bits - prefix
+        start = (value >> host_bits) << host_bits
+        end = start | ((1 << host_bits) - 1)
+
+        self.add_range(version, start, end, label)
+
+    # Add: Range
+    def add_range(self, version: int, start: int, end: int, label: str = 'blocked') -> None:
+        """
+        Add a raw integer range (inclusive on both ends).
+
+        :param version: IP version of the range (4 or 6).
+        :param start: First address of the range, as an integer.
+        :param end: Last address of the range, as an integer.
+        :param label: Label returned by lookups that match this range.
+        :return: None
+        """
+
+        if start > end:
+            start, end = end, start
+
+        self.pending[version].append((start, end, label))
+        self.compiled = False
+
+    # Compile: Ranges
+    def compile(self) -> None:
+        """
+        Flatten all added ranges into sorted, non-overlapping ranges ready for binary search.
+
+        :return: None
+        """
+
+        if self.compiled:
+            return
+
+        for version in (4, 6):
+            # Re-compile from everything added so far, including the ranges already compiled.
+            ranges = list(zip(self.starts[version], self.ends[version], self.labels[version]))
+            ranges += self.pending[version]
+
+            starts, ends, labels = [], [], []
+
+            def emit(start, end, label):
+                if start > end:
+                    return
+                # Merge with the previous range when it is adjacent and carries the same label.
+                if starts and labels[-1] == label and ends[-1] + 1 >= start:
+                    ends[-1] = max(ends[-1], end)
+                    return
+                starts.append(start)
+                ends.append(end)
+                labels.append(label)
+
+            # Wider ranges first on equal starts, so nested (more specific) ranges sit on top of the stack.
+            # (The sequence number keeps the heap from ever comparing labels.)
+            queue = [(start, -end, flag, label) for flag, (start, end, label) in enumerate(ranges)]
+            heapq.heapify(queue)
+            sequence = len(queue)
+
+            stack = []
+            cursor = 0
+            while queue:
+                start, end, _, label = heapq.heappop(queue)
+                end = -end
+
+                # Close every open range that ends before this one begins.
+                while stack and stack[-1][1] < start:
+                    top = stack.pop()
+                    emit(cursor, top[1], top[2])
+                    cursor = top[1] + 1
+
+                # The enclosing range owns the gap up to this range.
+                if stack:
+                    emit(cursor, start - 1, stack[-1][2])
+
+                    # A partial overlap is split: the part past the enclosing range is queued again on its own.
+                    if end > stack[-1][1]:
+                        heapq.heappush(queue, (stack[-1][1] + 1, -end, sequence, label))
+                        sequence += 1
+                        end = stack[-1][1]
+
+                stack.append((start, end, label))
+                cursor = max(cursor, start)
+
+            while stack:
+                top = stack.pop()
+                emit(cursor, top[1], top[2])
+                cursor = top[1] + 1
+
+            self.starts[version], self.ends[version], self.labels[version] = starts, ends, labels
+            self.pending[version] = []
+
+        self.compiled = True
+
+    # Lookup: Address
+    def lookup(self, ip) -> str | None:
+        """
+        Find the label of the most specific network containing the address.
+
+        :param ip: IP address as a string, or a (version, value) tuple from parse_ip().
+        :return: The label of the matching network, or None if the address is not indexed.
+        """
+
+        packed = parse_ip(ip) if isinstance(ip, str) else ip
+        if packed is None:
+            return None
+
+        self.compile()
+
+        version, value = packed
+        position = bisect_right(self.starts[version], value) - 1
+
+        if position >= 0 and value <= self.ends[version][position]:
+            return self.labels[version][position]
+
+        return None
+
+    # Lookup: Many addresses
+    def lookup_many(self, packed_list: list) -> list:
+        """
+        Look up many packed addresses in one pass.
+
+        :param packed_list: List of (version, value) tuples from parse_ip(), or None for invalid entries.
+        :return: List of labels (or None) in the same order as 'packed_list'.
+        """
+
+        self.compile()
+
+        results = [None] * len(packed_list)
+
+        for version in (4, 6):
+            starts, ends, labels = self.starts[version], self.ends[version], self.labels[version]
+            if not starts:
+                continue
+
+            # Walk the addresses in sorted order so the range cursor only ever moves forward.
+            order = sorted(
+                (packed[1], flag) for flag, packed in enumerate(packed_list) if packed and packed[0] == version
+            )
+            position = 0
+            for value, flag in order:
+                position = max(bisect_right(starts, value, position) - 1, 0)
+                if starts[position] <= value <= ends[position]:
+                    results[flag] = labels[position]
+
+        return results
+
+    # Load: CIDR file
+    def load(self, path: str, label: str = 'blocked') -> None:
+        """
+        Add every network of a text file with one network per line: a CIDR, a single IP address,
+        or an inclusive 'START_IP END_IP' range. Blank lines and '#' comments are ignored.
+
+        The whole file is parsed before anything is added, so a bad line leaves the index unchanged.
+
+        :param path: Path to the network file.
+        :param label: Label stored for every network in the file.
+        :return: None
+        :raises ValueError: If a line is not a valid CIDR, address or range.
+        """
+
+        ranges = []
+
+        with open(file=path, mode='r', encoding='utf-8', errors='replace') as file:
+            for number, line in enumerate(file, start=1):
+                fields = line.split('#', 1)[0].split()
+                if not fields:
+                    continue
+
+                try:
+                    if len(fields) == 1:
+                        network = NetworkIndex()
+                        network.add(fields[0])
+                        version = 4 if network.pending[4] else 6
+                        ranges.append((version,) + network.pending[version][0][:2])
+                        continue
+
+                    start, end = parse_ip(fields[0]), parse_ip(fields[1])
+                    if len(fields) > 2 or not start or not end or start[0] != end[0]:
+                        raise ValueError('expected a CIDR, an IP address or a START_IP END_IP range')
+                    ranges.append((start[0], start[1], end[1]))
+
+                except ValueError as e:
+                    raise ValueError(f"{path}:{number}: invalid network line '{line.strip()}' ({e})")
+
+        for version, start, end in ranges:
+            self.add_range(version, start, end, label)
+
+        self.compile()
+
+    @classmethod
+    def from_file(cls, path: str, label: str = 'blocked'):
+        """
+        Build an index from a text file with one network per line (see load).
+
+        :param path: Path to the network file.
+        :param label: Label stored for every network in the file.
+        :return: A compiled NetworkIndex.
+        """
+
+        index = cls()
+        index.load(path, label=label)
+        return index
+
+    # Load: ASN mapping file
+    @classmethod
+    def from_asn_file(cls, path: str):
+        """
+        Build an offline IP-to-ASN index. Each line maps a network to an AS number, either as
+        'CIDR ASN' (e.g. '1.1.1.0/24 13335') or as an ip2asn-style range 'START_IP END_IP ASN ...'
+        (tab or space separated). Blank lines, '#' comments and ASN 0 (not routed) are skipped.
+
+        :param path: Path to the ASN mapping file.
+        :return: A compiled NetworkIndex labelled with normalized ASNs ('AS13335').
+        """
+
+        index = cls()
+
+        with open(file=path, mode='r', encoding='utf-8', errors='replace') as file:
+            for line in file:
+                fields = line.split('#', 1)[0].split()
+                if len(fields) < 2:
+                    continue
+
+                if '/' in fields[0]:
+                    asn = normalize_asn(fields[1])
+                    if asn:
+                        index.add(fields[0], label=asn)
+                    continue
+
+                start, end = parse_ip(fields[0]), parse_ip(fields[1])
+                asn = normalize_asn(fields[2]) if len(fields) > 2 else None
+                if start and end and start[0] == end[0] and asn:
+                    index.add_range(start[0], start[1], end[1], label=asn)
+
+        index.compile()
+        return index
+
+
+# Reserved, private and bogon networks that can never be a public proxy.
+RESERVED_NETWORKS = {
+    'this-network': ['0.0.0.0/8', '::/128'],
+    'private': ['10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16', 'fc00::/7'],
+    'shared': ['100.64.0.0/10'],
+    'loopback': ['127.0.0.0/8', '::1/128'],
+    'link-local': ['169.254.0.0/16', 'fe80::/10'],
+    'protocol-assignments': ['192.0.0.0/24'],
+    'documentation': ['192.0.2.0/24', '198.51.100.0/24', '203.0.113.0/24', '2001:db8::/32'],
+    'relay': ['192.88.99.0/24'],
+    'benchmarking': ['198.18.0.0/15'],
+    'multicast': ['224.0.0.0/4', 'ff00::/8'],
+    'reserved': ['240.0.0.0/4'],
+    'broadcast': ['255.255.255.255/32'],
+    'ipv4-mapped': ['::ffff:0:0/96'],
+    'discard': ['100::/64'],
+}
+
+# Protocols the checker knows how to handle.
+SUPPORTED_PROTOCOLS = ('http', 'https', 'socks4', 'socks5')
+
+# Shared index of the reserved networks, built once on first use.
+_reserved_index = None
+
+
+def reserved_index() -> NetworkIndex:
+    """Return the shared, compiled index of reserved networks."""
+    global _reserved_index
+
+    if _reserved_index is None:
+        index = NetworkIndex()
+        for label, networks in RESERVED_NETWORKS.items():
+            for network in networks:
+                index.add(network, label=label)
+        index.compile()
+        _reserved_index = index
+
+    return _reserved_index
+
+
+def parse_ip(ip) -> tuple | None:
+    """
+    Pack an IP address into an integer.
+
+    :param ip: IPv4 or IPv6 address as a string (IPv6 may be wrapped in brackets).
+    :return: A (version, value) tuple, or None if the address is not valid.
+    """
+
+    if not isinstance(ip, str):
+        return None
+
+    ip = ip.strip().strip('[]')
+
+    try:
+        # inet_pton is strict: no leading zeros tricks, no short forms like '10.1'.
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+    except (OSError, ValueError):
+        pass
+
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), 'big')
+    except (OSError, ValueError):
+        return None
+
+
+def parse_hostname(host) -> str | None:
+    """
+    Validate a hostname (RFC 1123 labels, internationalized names in IDNA form).
+
+    :param host: Hostname as a string.
+    :return: The hostname in lowercase ASCII without a trailing dot, or None if it is not valid.
+             (An all-numeric last label is refused, so malformed IPv4 addresses are not taken for names.)
+    """
+
+    if not isinstance(host, str):
+        return None
+
+    try:
+        host = host.strip().rstrip('.').encode('idna').decode('ascii').lower()
+    except UnicodeError:
+        return None
+
+    labels = host.split('.')
+    if not host or len(host) > 253 or labels[-1].isdigit():
+        return None
+
+    for label in labels:
+        if not 0 < len(label) < 64 or label[0] == '-' or label[-1] == '-':
+            return None
+        if not all(char.isalnum() or char == '-' for char in label):
+            return None
+
+    return host
+
+
+def parse_port(port) -> int | None:
+    """
+    Validate a port number.
+
+    :param port: Port as an int or a numeric string.
+    :return: The port as an int in 1..65535, or None if it is not valid.
+    """
+
+    if isinstance(port, bool):
+        return None
+
+    if isinstance(port, str):
+        port = port.strip()
+        if not port.isdigit():
+            return None
+
+    try:
+        port = int(port)
+    except (TypeError, ValueError):
+        return None
+
+    return port if 0 < port < 65536 else None
+
+
+def normalize_asn(asn) -> str | None:
+    """
+    Normalize an AS number to the 'AS<number>' form.
+
+    :param asn: AS number as an int or a string ('13335', 'AS13335', 'as13335').
+    :return: The normalized ASN, or None for invalid and unrouted (0) numbers.
+    """
+
+    asn = str(asn).strip().upper().removeprefix('AS')
+    return f'AS{int(asn)}' if asn.isdigit() and int(asn) > 0 else None
+
+
+def classify_proxies(proxy_list: list, blocked: list = None, allowed=None, asn_map=None,
+                     blocked_asns: set = None, reserved: bool = True) -> list:
+    """
+    Classify proxies in bulk before any of them reaches the network.
+
+    Addresses are parsed once, then looked up against the reserved ranges (and any extra
+    indexes) in a single sorted pass per index.
+
+    Proxies given by hostname are accepted when the name is valid: there is no address to look up
+    before the check resolves it, so only 'localhost' names are rejected (as 'loopback'), and an
+    allowlist rejects them all ('not-allowed'), since they cannot be shown to be inside it.
+
+    :param proxy_list: List of proxy dictionaries with 'ip', 'port', and 'protocol'.
+    :param blocked: Optional list of extra NetworkIndex objects; a match rejects the proxy with the index label.
+    :param allowed: Optional NetworkIndex; when given, proxies outside of it are rejected as 'not-allowed'.
+    :param asn_map: Optional IP-to-ASN NetworkIndex (see NetworkIndex.from_asn_file).
+    :param blocked_asns: Optional set of normalized ASNs ('AS13335') to reject as 'asn'.
+    :param reserved: Boolean flag to reject reserved, private and bogon networks. Default is True.
+    :return: List of reasons in the same order as 'proxy_list': None for a valid proxy, otherwise one of
+             'syntax', 'port', 'protocol', a reserved network label, a label from 'blocked',
+             'not-allowed', or 'asn'.
+    """
+
+    reasons = [None] * len(proxy_list)
+    packed_list = [None] * len(proxy_list)
+    hostnames = set()  # Flags of the valid proxies given by hostname.
+
+    for flag, proxy in enumerate(proxy_list):
+        if not isinstance(proxy, dict):
+            reasons[flag] = 'syntax'
+            continue
+
+        packed = parse_ip(proxy.get('ip', ''))
+        hostname = parse_hostname(proxy.get('ip', '')) if packed is None else None
+        if packed is None and hostname is None:
+            reasons[flag] = 'syntax'
+        elif parse_port(proxy.get('port', '')) is None:
+            reasons[flag] = 'port'
+        elif str(proxy.get('protocol', '')).strip().lower() not in SUPPORTED_PROTOCOLS:
+            reasons[flag] = 'protocol'
+        elif hostname is None:
+            packed_list[flag] = packed
+        elif reserved and (hostname == 'localhost' or hostname.endswith('.localhost')):
+            reasons[flag] = 'loopback'
+        else:
+            hostnames.add(flag)
+
+    def reject(flag, reason):
+        reasons[flag] = reason
+        packed_list[flag] = None  # Already rejected; skip it in the next index.
+
+    for index in ([reserved_index()] if reserved else []) + list(blocked or []):
+        for flag, label in enumerate(index.lookup_many(packed_list)):
+            if label is not None:
+                reject(flag, label)
+
+    if allowed is not None:
+        for flag, label in enumerate(allowed.lookup_many(packed_list)):
+            if label is None and (packed_list[flag] is not None or flag in hostnames):
+                reject(flag, 'not-allowed')
+
+    if asn_map is not None and blocked_asns:
+        for flag, asn in enumerate(asn_map.lookup_many(packed_list)):
+            if asn in blocked_asns:
+                reject(flag, 'asn')
+
+    return reasons
@@ -0,0 +1,542 @@
+import functools  # For building the TLS context once.
+import ipaddress  # For telling IP targets from hostnames in proxy requests.
+import socket  # For raw TCP connections to the proxies.
+import ssl  # For HTTPS test URLs.
+import struct  # For packing ports in SOCKS requests.
+import threading  # For cancelling the probes in flight from another thread.
+import time  # For timing every phase of a check (monotonic, high resolution).
+from contextlib import contextmanager  # For timing phases with 'with' blocks.
+from urllib.parse import urlsplit  # For reading the target host and port from the view URL.
+
+
+# Probe depths, from cheapest to most complete.
+DEPTHS = ('connect', 'handshake', 'full')
+
+# Phases of a check, in order (a phase the check does not need is left out of its timings).
+PHASES = ('dns', 'connect', 'handshake', 'tls', 'ttfb', 'transfer')
+
+
+class ProbeError(Exception):
+    """Raised when a proxy refuses or breaks a probe."""
+
+
+class TargetRefused(ProbeError):
+    """
+    Raised when a proxy works but cannot reach the target (refused, host or network unreachable).
+    'code' is the matching SOCKS5 reply code (0x03 network unreachable, 0x04 host unreachable, 0x05 refused).
+    """
+
+    def __init__(self, message: str, code: int):
+        super().__init__(message)
+        self.code = code
+
+
+# Cancellation
+class Cancel:
+    """
+    Stops the probes sharing it, from any thread.
+
+    Once set, every probe fails at its next phase, and the sockets they have open are shut down, so a blocked
+    connect or read returns at once instead of at its timeout. (A DNS lookup in progress cannot be interrupted.)
+    """
+
+    def __init__(self):
+        """Initialize the Cancel class."""
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.sockets = set()
+
+    def is_set(self) -> bool:
+        """Return True once the probes are cancelled."""
+        return self.event.is_set()
+
+    def set(self) -> None:
+        """Cancel the probes: shut down every tracked socket."""
+        with self.lock:
+            self.event.set()
+            sockets = list(self.sockets)
+        for sock in sockets:
+            shut(sock)
+
+    def track(self, sock: socket.socket) -> None:
+        """Track an open socket (shut down at once if already cancelled)."""
+        with self.lock:
+            if not self.event.is_set():
+                self.sockets.add(sock)
+                return
+        shut(sock)
+
+    def untrack(self, sock: socket.socket) -> None:
+        """Stop tracking a socket."""
+        with self.lock:
+            self.sockets.discard(sock)
+
+
+def shut(sock: socket.socket) -> None:
+    """Shut a socket down in both directions, ignoring errors (e.g. not connected yet, or already closed)."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def ascii_host(host: str) -> str:
+    """Return a hostname in ASCII (internationalized names in IDNA form)."""
+    try:
+        host.encode('ascii')
+        return host
+    except UnicodeEncodeError:
+        return host.encode('idna').decode('ascii')
+
+
+# Requests: HTTP CONNECT
+def connect_request(host: str, port: int) -> bytes:
+    """Build an HTTP CONNECT request for host:port."""
+    host = ascii_host(host)
+    authority = f'[{host}]:{port}' if ':' in host else f'{host}:{port}'
+    return f'CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n\r\n'.encode('ascii')
+
+
+def check_connect_reply(head: bytes) -> None:
+    """Raise ProbeError unless an HTTP CONNECT reply head is a '200' (TargetRefused for a '502' or '504')."""
+    parts = head.split(b' ', 2)
+    if len(parts) < 2 or parts[1] != b'200':
+        message = f'HTTP CONNECT refused: {head.splitlines()[0] if head else head!r}'
+        if len(parts) > 1 and parts[1] in (b'502', b'504'):
+            # The proxy answered, but the target did not: bad gateway (refused) or gateway timeout (unreachable).
+            raise TargetRefused(message, 0x05 if parts[1] == b'502' else 0x04)
+        raise ProbeError(message)
+
+
+# Requests: SOCKS4 / SOCKS4a
+def socks4_request(host: str, port: int) -> bytes:
+    """Build a SOCKS4 CONNECT request (SOCKS4a when the target is a hostname)."""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        # SOCKS4a: let the proxy resolve the hostname.
+        return b'\x04\x01' + struct.pack('!H', port) + b'\x00\x00\x00\x01\x00' + host.encode('idna') + b'\x00'
+
+    if address.version == 6:
+        raise ProbeError('SOCKS4 cannot reach IPv6 targets')
+
+    return b'\x04\x01' + struct.pack('!H', port) + address.packed + b'\x00'
+
+
+def check_socks4_reply(reply: bytes) -> None:
+    """Raise ProbeError unless a SOCKS4 reply grants the request."""
+    if len(reply) < 2 or reply[1] != 0x5a:
+        raise ProbeError(f'SOCKS4 request rejected (code {reply[1] if len(reply) > 1 else None})')
+
+
+# Requests: SOCKS5
+SOCKS5_GREETING = b'\x05\x01\x00'  # Version 5, one method: no authentication.
+
+
+def socks5_request(host: str, port: int) -> bytes:
+    """Build a SOCKS5 CONNECT request (by IP when the target is an address, else by name)."""
+    try:
+        address = ipaddress.ip_address(host)
+        target = (b'\x01' if address.version == 4 else b'\x04') + address.packed
+    except ValueError:
+        encoded = host.encode('idna')
+        target = b'\x03' + bytes([len(encoded)]) + encoded
+
+    return b'\x05\x01\x00' + target + struct.pack('!H', port)
+
+
+def socks5_reply_length(head: bytes) -> int:
+    """
+    Check the first 5 bytes of a SOCKS5 reply and return how many more bytes it has.
+
+    :param head: First 5 bytes of the reply (version, status, reserved, address type, first address byte).
+    :return: Number of remaining bytes (rest of the bound address and port).
+    """
+
+    if head[1] in (0x03, 0x04, 0x05):
+        raise TargetRefused(f'SOCKS5 target unreachable (code {head[1]:#x})', head[1])
+    if head[1] != 0:
+        raise ProbeError(f'SOCKS5 request rejected (code {head[1]:#x})')
+
+    if head[3] == 1:
+        return 4 - 1 + 2
+    if head[3] == 4:
+        return 16 - 1 + 2
+    return head[4] + 2  # Domain name: the first byte is its length.
+
+
+# Sockets: Connect
+def connect(ip: str, port: int, timeout: float, cancel: Cancel = None) -> socket.socket:
+    """Open a TCP connection like socket.create_connection, with the socket tracked by 'cancel' while it connects."""
+    error = None
+    for family, kind, proto, _, address in socket.getaddrinfo(ip, port, socket.AF_UNSPEC, socket.SOCK_STREAM):
+        sock = socket.socket(family, kind, proto)
+        sock.settimeout(timeout)
+        if cancel is not None:
+            cancel.track(sock)
+        try:
+            sock.connect(address)
+            return sock
+        except OSError as e:
+            error = e
+            if cancel is not None:
+                cancel.untrack(sock)
+            sock.close()
+    raise error or OSError(f'No address for {ip}')
+
+
+# Sockets: Read helpers
+def read_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly 'size' bytes from a socket."""
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ProbeError('Connection closed unexpectedly')
+        data += chunk
+    return data
+
+
+def read_head(sock: socket.socket, limit: int = 65536) -> bytes:
+    """Read an HTTP head (up to the blank line) from a socket."""
+    data = b''
+    while b'\r\n\r\n' not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ProbeError('Connection closed unexpectedly')
+        data += chunk
+        if len(data) > limit:
+            raise ProbeError('HTTP head too large')
+    return data
+
+
+# Handshake
+def handshake(sock: socket.socket, protocol: str, host: str, port: int) -> None:
+    """
+    Ask a proxy for a tunnel to host:port over an already connected socket.
+
+    :param sock: Socket connected to the proxy.
+    :param protocol: Proxy protocol ('http', 'https', 'socks4' or 'socks5').
+    :param host: Target hostname or IP address.
+    :param port: Target port.
+    :return: None (raises ProbeError if the proxy refuses).
+    """
+
+    protocol = protocol.lower()
+
+    if protocol in ('http', 'https'):
+        sock.sendall(connect_request(host, port))
+        check_connect_reply(read_head(sock))
+
+    elif protocol == 'socks4':
+        sock.sendall(socks4_request(host, port))
+        check_socks4_reply(read_exactly(sock, 8))
+
+    elif protocol == 'socks5':
+        sock.sendall(SOCKS5_GREETING)
+        if read_exactly(sock, 2) != b'\x05\x00':
+            raise ProbeError('SOCKS5 proxy requires authentication')
+
+        sock.sendall(socks5_request(host, port))
+        read_exactly(sock, socks5_reply_length(read_exactly(sock, 5)))
+
+    else:
+        raise ProbeError(f'Unsupported protocol: {protocol}')
+
+
+# Timing
+class PhaseTimer:
+    """
+    Times the consecutive phases of one check with time.perf_counter.
+
+        timer = PhaseTimer()
+        with timer.phase('connect'):
+            sock = socket.create_connection(...)
+
+    A phase that raises is still timed (up to the failure) and stays in 'current', so errors can name it.
+    With a Cancel, a phase does not start once it is set.
+    """
+
+    def __init__(self, cancel: Cancel = None):
+        """Initialize the PhaseTimer class and start the total clock."""
+        self.phases = {}
+        self.current = None
+        self.cancel = cancel
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time one phase."""
+        self.current = name
+        if self.cancel is not None and self.cancel.is_set():
+            raise ProbeError('Cancelled')
+        mark = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - mark
+
+    def elapsed(self) -> float:
+        """Return the seconds since the timer started."""
+        return time.perf_counter() - self.started
+
+
+# Target
+def target_of(url: str) -> tuple:
+    """
+    Return the (host, port) a view URL points to.
+
+    :param url: Test URL (e.g. 'https://www.google.com').
+    :return: (host, port) tuple; the port defaults to 443 for https and 80 otherwise.
+    """
+
+    parts = urlsplit(url)
+    return parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)
+
+
+def resolve(host: str, port: int, family: int = socket.AF_UNSPEC) -> str:
+    """
+    Resolve a hostname to its first IP address (IP addresses are returned as they are).
+
+    :param host: Hostname or IP address.
+    :param port: Port, for getaddrinfo.
+    :param family: socket.AF_INET for IPv4 only (SOCKS4). Default is any family.
+    :return: IP address as a string.
+    """
+
+    return socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)[0][4][0]
+
+
+@functools.lru_cache(maxsize=None)
+def tls_context() -> ssl.SSLContext:
+    """Return the shared TLS context (certificate and hostname verification on), built on first use."""
+    return ssl.create_default_context()
+
+
+# HTTP: Request
+def get_request(url: str, absolute: bool = False) -> bytes:
+    """
+    Build a minimal HTTP/1.1 GET request for a URL.
+
+    :param url: Test URL.
+    :param absolute: Boolean flag to use the absolute form (plain HTTP through an HTTP proxy). Default is False.
+    :return: The request bytes.
+    """
+
+    parts = urlsplit(url)
+    host = ascii_host(parts.hostname)
+    authority = f'[{host}]' if ':' in host else host
+    authority += f':{parts.port}' if parts.port else ''
+    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+    target = f'{parts.scheme}://{authority}{path}' if absolute else path
+
+    return (f'GET {target} HTTP/1.1\r\n'
+            f'Host: {authority}\r\n'
+            f'User-Agent: ProxyToolkit\r\n'
+            f'Accept: */*\r\n'
+            f'Accept-Encoding: identity\r\n'
+            f'Connection: close\r\n\r\n').encode('ascii')
+
+
+# HTTP: Response
+def read_response(sock: socket.socket, data: bytes, limit: int) -> tuple:
+    """
+    Read the rest of an HTTP response, up to 'limit' bytes.
+
+    :param sock: Socket (or TLS socket) the response comes from.
+    :param data: Bytes already read (at least the first one).
+    :param limit: Maximum number of bytes to read.
+    :return: Tuple (status code, headers dictionary with lowercase names, dechunked body, bytes read).
+              (The byte count includes the chunk framing: it is what came over the socket.)
+    """
+
+    while b'\r\n\r\n' not in data:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ProbeError('Connection closed unexpectedly')
+        data += chunk
+        if len(data) > limit:
+            raise ProbeError('HTTP head too large')
+
+    head, _, body = data.partition(b'\r\n\r\n')
+    lines = head.decode('iso-8859-1').split('\r\n')
+
+    status = lines[0].split(' ', 2)
+    if len(status) < 2 or not status[0].startswith('HTTP/') or not status[1].isdigit():
+        raise ProbeError(f'Not an HTTP response: {lines[0][:80]!r}')
+
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    length = headers.get('content-length', '')
+    length = int(length) if length.isdigit() else None
+    chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+
+    # Connection: close was asked, but stop as soon as the body is complete anyway.
+    while len(head) + len(body) < limit:
+        if length is not None and len(body) >= length:
+            break
+        if chunked and body.endswith(b'0\r\n\r\n'):
+            break
+
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        body += chunk
+
+    # Bytes on the wire: counted before the chunk framing is stripped.
+    received = len(head) + 4 + len(body)
+
+    if chunked:
+        body = dechunk(body)
+
+    return int(status[1]), headers, body, received
+
+
+def dechunk(body: bytes) -> bytes:
+    """Decode a chunked HTTP body (a truncated body keeps the chunks read so far)."""
+    decoded = b''
+    while body:
+        size, _, rest = body.partition(b'\r\n')
+        try:
+            size = int(size.split(b';')[0], 16)
+        except ValueError:
+            break
+        if not size:
+            break
+        decoded += rest[:size]
+        body = rest[size + 2:]
+    return decoded
+
+
+def decode_body(body: bytes, headers: dict) -> str:
+    """Decode a response body with the charset of its Content-Type (UTF-8 by default)."""
+    charset = 'utf-8'
+    for parameter in headers.get('content-type', '').split(';')[1:]:
+        name, _, value = parameter.strip().partition('=')
+        if name.lower() == 'charset' and value:
+            charset = value.strip('"\'')
+    try:
+        return body.decode(charset, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+# Probe
+def probe(ip: str, port: int, protocol: str, url: str, depth: str = 'handshake', timeout: float = 9,
+          limit: int = 1 << 20, resolver=None, cancel: Cancel = None) -> dict:
+    """
+    Check a proxy over a raw socket, timing every phase.
+
+    - 'connect': the proxy accepts TCP connections.
+    - 'handshake': the proxy also agrees to open a tunnel to the view URL's host (HTTP CONNECT or SOCKS CONNECT).
+    - 'full': a GET of the view URL goes through the proxy and a response comes back. Plain HTTP URLs go to
+      HTTP proxies as absolute-form requests, everything else through a tunnel.
+
+    With a resolver (Resolver.Resolver), tunnels are opened by IP: SOCKS4, SOCKS5 and HTTP CONNECT requests
+    carry the cached address of the target, while the Host header and the TLS SNI keep the hostname. If the
+    name does not resolve locally, the proxy gets the hostname instead (SOCKS4a, SOCKS5 by name, CONNECT by name).
+    Without one, full SOCKS checks resolve the target on every check (like socks4:// and socks5:// proxy URLs)
+    and everything else leaves the name to the proxy.
+
+    Phase timings (seconds, see PHASES): 'dns' (local resolution), 'connect' (TCP connect to the proxy),
+    'handshake' (proxy tunnel), 'tls' (TLS handshake with the target), 'ttfb' (request sent to first response
+    byte) and 'transfer' (rest of the response). A failed check keeps the phases it reached, and its error
+    names the phase it failed in (e.g. 'handshake: timed out').
+
+    :param ip: IP address of the proxy.
+    :param port: Port number of the proxy.
+    :param protocol: Proxy protocol ('http', 'https', 'socks4' or 'socks5').
+    :param url: Test URL.
+    :param depth: 'connect', 'handshake' or 'full'. Default is 'handshake'.
+    :param timeout: Timeout in seconds for each socket operation.
+    :param limit: Maximum number of response bytes to read (for 'full'). Default is 1 MiB.
+    :param resolver: Optional Resolver whose cache provides the target address. Default is None.
+    :param cancel: Optional Cancel that stops the probe between phases and shuts its socket down. Default is None.
+    :return: Dictionary with proxy status information (the Toolkit check keys, plus 'depth', 'phases' and 'bytes').
+    """
+
+    protocol = protocol.lower()
+    info = {'ip': ip, 'port': port, 'protocol': protocol}
+    parts = urlsplit(url)
+    host, target_port = target_of(url)
+    secure = parts.scheme == 'https'
+    socks = protocol in ('socks4', 'socks5')
+    # Plain HTTP through an HTTP proxy needs no tunnel: the proxy gets the absolute URL instead.
+    tunnel = depth == 'handshake' or (depth == 'full' and (secure or socks))
+    family = socket.AF_INET if protocol == 'socks4' else socket.AF_UNSPEC
+
+    timer = PhaseTimer(cancel)
+    status_code, content, received = None, '', 0
+
+    try:
+        address = host
+        if tunnel and resolver is not None:
+            with timer.phase('dns'):
+                try:
+                    address = resolver.resolve(host, family)
+                except OSError:
+                    address = host  # Not resolvable here: let the proxy try.
+        elif tunnel and socks and depth == 'full':
+            with timer.phase('dns'):
+                address = resolve(host, target_port, family)
+
+        with timer.phase('connect'):
+            sock = connect(ip, int(port), timeout, cancel)
+
+        try:
+            if tunnel:
+                with timer.phase('handshake'):
+                    handshake(sock, protocol, address, target_port)
+
+            if depth == 'full':
+                if secure:
+                    with timer.phase('tls'):
+                        tls = tls_context().wrap_socket(sock, server_hostname=host, do_handshake_on_connect=False)
+                        if cancel is not None:
+                            # The TLS socket took over the file descriptor: track it before its handshake blocks.
+                            cancel.untrack(sock)
+                            cancel.track(tls)
+                        sock = tls
+                        sock.do_handshake()
+
+                with timer.phase('ttfb'):
+                    sock.sendall(get_request(url, absolute=not tunnel))
+                    first = sock.recv(65536)
+                    if not first:
+                        raise ProbeError('Connection closed unexpectedly')
+
+                with timer.phase('transfer'):
+                    status_code, headers, body, received = read_response(sock, first, limit)
+                    content = decode_body(body, headers)
+
+        finally:
+            if cancel is not None:
+                cancel.untrack(sock)
+            sock.close()
+
+        return {
+            'info': info,
+            'alive': True,
+            'status_code': status_code,
+            'content': content,
+            'time': timer.elapsed(),
+            'depth': depth,
+            'phases': timer.phases,
+            'bytes': received,
+        }
+
+    except (OSError, ProbeError) as e:
+        return {
+            'info': info,
+            'alive': False,
+            'status_code': None,
+            'content': None,
+            'time': timer.elapsed(),
+            'error': f'{timer.current}: {str(e) or type(e).__name__}',
+            'depth': depth,
+            'phases': timer.phases,
+            'bytes': received,
+        }
@@ -0,0 +1,312 @@
+import math  # For NaN placeholders of missing numbers.
+import sys  # For interning repeated strings (countries, ASNs, ...).
+import time  # For age filters.
+from array import array  # For compact numeric columns.
+from datetime import datetime  # For parsing Geonode timestamps.
+
+
+# Protocols as bit flags, so one byte holds every protocol a proxy supports.
+PROTOCOL_FLAGS = {'http': 1, 'https': 2, 'socks4': 4, 'socks5': 8}
+
+# Anonymity levels, from least to most anonymous (0 is unknown).
+ANONYMITY_LEVELS = {'transparent': 1, 'anonymous': 2, 'elite': 3}
+
+# Numeric columns: name -> (array type code, Geonode field).
+NUMERIC_COLUMNS = {
+    'port': ('H', 'port'),
+    'protocols': ('B', 'protocols'),
+    'anonymity': ('B', 'anonymityLevel'),
+    'google': ('b', 'google'),
+    'up_time': ('f', 'upTime'),
+    'up_time_success': ('l', 'upTimeSuccessCount'),
+    'up_time_tries': ('l', 'upTimeTryCount'),
+    'response_time': ('f', 'responseTime'),
+    'latency': ('f', 'latency'),
+    'speed': ('f', 'speed'),
+    'last_checked': ('d', 'lastChecked'),
+    'created_at': ('d', 'created_at'),
+    'updated_at': ('d', 'updated_at'),
+}
+
+# Text columns: name -> Geonode field.
+TEXT_COLUMNS = {
+    'ip': 'ip',
+    'country': 'country',
+    'city': 'city',
+    'region': 'region',
+    'asn': 'asn',
+    'isp': 'isp',
+    'org': 'org',
+    'id': '_id',
+}
+
+
+class ProxyTable:
+    """
+    ProxyTable Module.
+    A compact, typed, column-oriented table of Geonode proxy records.
+
+    Every Geonode field is parsed once: numbers go to typed arrays (one per field, NaN or -1 when
+    missing), protocols to a bit mask, anonymity to a small code, and repeated strings are interned.
+    Filtering and sorting then work on the columns directly, without re-parsing any JSON.
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self):
+        """Initialize an empty ProxyTable."""
+
+        self.columns = {name: array(code) for name, (code, _) in NUMERIC_COLUMNS.items()}
+        self.columns.update({name: [] for name in TEXT_COLUMNS})
+
+    def __len__(self):
+        """Return the number of records."""
+        return len(self.columns['ip'])
+
+    def __repr__(self):
+        """Return a representation of the ProxyTable instance."""
+        return f"ProxyTable | Records: {len(self)} | Columns: {', '.join(self.columns)}"
+
+    def __getitem__(self, flag: int) -> dict:
+        """Return one record as a dictionary (protocols and anonymity decoded)."""
+        return self.row(flag)
+
+    def __iter__(self):
+        """Iterate over the records as dictionaries."""
+        return (self.row(flag) for flag in range(len(self)))
+
+    # Build: From Geonode
+    @classmethod
+    def from_geonode(cls, records: list):
+        """
+        Build a table from Geonode API records (the 'data' list of the API response).
+
+        :param records: List of Geonode proxy dictionaries.
+        :return: A ProxyTable.
+        """
+
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    # Add: Record
+    def append(self, record: dict) -> None:
+        """
+        Parse one Geonode record into the columns.
+
+        :param record: Geonode proxy dictionary.
+        :return: None
+        """
+
+        # Parse everything first, so a bad record never leaves the columns with different lengths.
+        values = {
+            'port': int(record.get('port') or 0),
+            'protocols': protocol_mask(record.get('protocols') or []),
+            'anonymity': ANONYMITY_LEVELS.get(str(record.get('anonymityLevel', '')).lower(), 0),
+            'google': -1 if record.get('google') is None else int(bool(record.get('google'))),
+            'up_time': to_float(record.get('upTime')),
+            'up_time_success': to_int(record.get('upTimeSuccessCount')),
+            'up_time_tries': to_int(record.get('upTimeTryCount')),
+            'response_time': to_float(record.get('responseTime')),
+            'latency': to_float(record.get('latency')),
+            'speed': to_float(record.get('speed')),
+            'last_checked': to_timestamp(record.get('lastChecked')),
+            'created_at': to_timestamp(record.get('created_at')),
+            'updated_at': to_timestamp(record.get('updated_at')),
+        }
+
+        for name, field in TEXT_COLUMNS.items():
+            value = record.get(field)
+            values[name] = sys.intern(str(value)) if value not in (None, '') else ''
+
+        for name, value in values.items():
+            self.columns[name].append(value)
+
+    # Read: Record
+    def row(self, flag: int) -> dict:
+        """
+        Return one record as a dictionary.
+
+        :param flag: Record index.
+        :return: Dictionary of every column, with 'protocols' as a list and 'anonymity' as a name.
+        """
+
+        record = {name: column[flag] for name, column in self.columns.items()}
+        record['protocols'] = protocol_names(record['protocols'])
+        record['anonymity'] = anonymity_name(record['anonymity'])
+        record['google'] = None if record['google'] < 0 else bool(record['google'])
+        return record
+
+    # Select: Records
+    def select(self, flags) -> 'ProxyTable':
+        """
+        Return a new table with the records at the given indexes, in that order.
+
+        :param flags: Iterable of record indexes.
+        :return: A new ProxyTable.
+        """
+
+        flags = list(flags)
+        table = ProxyTable()
+
+        for name, column in self.columns.items():
+            if isinstance(column, array):
+                table.columns[name] = array(column.typecode, [column[flag] for flag in flags])
+            else:
+                table.columns[name] = [column[flag] for flag in flags]
+
+        return table
+
+    # Filter: Records
+    def filter(self, country=None, min_up_time: float = None, max_response_time: float = None,
+               protocols=None, anonymity: str = None, google: bool = None, max_age: float = None,
+               asn=None) -> 'ProxyTable':
+        """
+        Return a new table with the records matching every given condition.
+
+        :param country: Country code or list of codes ('US', ['DE', 'FR']).
+        :param min_up_time: Minimum uptime percentage (0 ~ 100).
+        :param max_response_time: Maximum response time in milliseconds.
+        :param protocols: Protocol or list of protocols; records supporting any of them match.
+        :param anonymity: Minimum anonymity level ('transparent', 'anonymous' or 'elite').
+        :param google: Required Google-passed flag.
+        :param max_age: Maximum seconds since Geonode last checked the proxy.
+        :param asn: ASN or list of ASNs ('AS13335').
+        :return: A new ProxyTable.
+        """
+
+        flags = range(len(self))
+        columns = self.columns
+
+        # Each condition narrows the candidate indexes, scanning a single column.
+        if country is not None:
+            countries = {country} if isinstance(country, str) else set(country)
+            flags = [flag for flag in flags if columns['country'][flag] in countries]
+
+        if min_up_time is not None:
+            flags = [flag for flag in flags if columns['up_time'][flag] >= min_up_time]
+
+        if max_response_time is not None:
+            flags = [flag for flag in flags if columns['response_time'][flag] <= max_response_time]
+
+        if protocols is not None:
+            mask = protocol_mask([protocols] if isinstance(protocols, str) else protocols)
+            flags = [flag for flag in flags if columns['protocols'][flag] & mask]
+
+        if anonymity is not None:
+            level = ANONYMITY_LEVELS[anonymity.lower()]
+            flags = [flag for flag in flags if columns['anonymity'][flag] >= level]
+
+        if google is not None:
+            flags = [flag for flag in flags if columns['google'][flag] == int(google)]
+
+        if max_age is not None:
+            oldest = time.time() - max_age
+            flags = [flag for flag in flags if columns['last_checked'][flag] >= oldest]
+
+        if asn is not None:
+            asns = {asn} if isinstance(asn, str) else set(asn)
+            flags = [flag for flag in flags if columns['asn'][flag] in asns]
+
+        return self.select(flags)
+
+    # Sort: Records
+    def sort_by(self, column: str, reverse: bool = False) -> 'ProxyTable':
+        """
+        Return a new table sorted by one column; missing values (NaN) always go last.
+
+        :param column: Column name (e.g. 'up_time', 'response_time', 'last_checked', 'country').
+        :param reverse: Boolean flag to sort in descending order. Default is False.
+        :return: A new ProxyTable.
+        """
+
+        values = self.columns[column]
+        missing = [flag for flag in range(len(self)) if values[flag] != values[flag]]  # NaN != NaN
+        present = [flag for flag in range(len(self)) if values[flag] == values[flag]]
+        present.sort(key=values.__getitem__, reverse=reverse)
+
+        return self.select(present + missing)
+
+    # Export: Standard list
+    def to_list(self, expand: bool = True, metadata: bool = True) -> list:
+        """
+        Convert the table to the standard proxy list used by the checker.
+
+        :param expand: Boolean flag to emit one entry per supported protocol (else only the first). Default is True.
+        :param metadata: Boolean flag to keep 'upTime', 'speed', 'lastChecked' and 'responseTime',
+                         used by Toolkit.schedule_the_proxies. Default is True.
+        :return: List of dictionaries with 'ip', 'port' and 'protocol' (and the metadata).
+        """
+
+        proxies_list = []
+        columns = self.columns
+
+        for flag in range(len(self)):
+            names = protocol_names(columns['protocols'][flag])
+            for protocol in (names if expand else names[:1]):
+                extract = {'ip': columns['ip'][flag], 'port': str(columns['port'][flag]), 'protocol': protocol}
+
+                if metadata:
+                    extract['upTime'] = none_if_nan(columns['up_time'][flag])
+                    extract['speed'] = none_if_nan(columns['speed'][flag])
+                    extract['lastChecked'] = none_if_nan(columns['last_checked'][flag])
+                    extract['responseTime'] = none_if_nan(columns['response_time'][flag])
+
+                proxies_list.append(extract)
+
+        return proxies_list
+
+
+def protocol_mask(protocols: list) -> int:
+    """Pack a list of protocol names into a bit mask (unknown names are ignored)."""
+    mask = 0
+    for protocol in protocols:
+        mask |= PROTOCOL_FLAGS.get(str(protocol).lower(), 0)
+    return mask
+
+
+def protocol_names(mask: int) -> list:
+    """Unpack a protocol bit mask into a list of names."""
+    return [name for name, flag in PROTOCOL_FLAGS.items() if mask & flag]
+
+
+def anonymity_name(level: int) -> str | None:
+    """Return the name of an anonymity code (None for unknown)."""
+    for name, code in ANONYMITY_LEVELS.items():
+        if code == level:
+            return name
+    return None
+
+
+def to_float(value) -> float:
+    """Convert a value to float, NaN if missing or invalid."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def to_int(value) -> int:
+    """Convert a value to int, -1 if missing or invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+def to_timestamp(value) -> float:
+    """Convert a Unix timestamp or an ISO 8601 date ('2024-08-01T12:00:00.000Z') to seconds, NaN if missing."""
+    if isinstance(value, str) and not value.replace('.', '', 1).isdigit():
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return math.nan
+    return to_float(value)
+
+
+def none_if_nan(value: float) -> float | None:
+    """Return None for NaN, the value otherwise."""
+    return None if value != value else value
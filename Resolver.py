@@ -0,0 +1,198 @@
+import importlib.util  # For detecting the optional dnspython without importing it.
+import ipaddress  # For passing IP addresses through without a lookup.
+import socket  # For the system resolver (getaddrinfo).
+import threading  # For resolving each name once, even with many checker threads.
+import time  # For cache expiry.
+from Lazy import LazyModule
+
+# Optional (dnspython): real record TTLs instead of the default one, imported on the first lookup.
+if importlib.util.find_spec('dns') is not None:
+    dns_resolver = LazyModule('dns.resolver')
+    dns_exception = LazyModule('dns.exception')
+else:
+    dns_resolver = dns_exception = None
+
+
+class Resolver:
+    """
+    Resolver Module.
+    Resolves check targets once and caches their addresses for as long as their TTL allows.
+
+    Checks then connect by IP, so the system resolver is out of the hot path: with many checks in flight,
+    only the first one for a name waits for the lookup (the others wait for that same lookup, not a new one),
+    and the rest of the run reads the cache. Failed lookups are cached briefly too.
+
+    TTLs come from the DNS records when dnspython is installed; otherwise getaddrinfo is used and
+    every entry lives 'ttl' seconds.
+
+    Each Toolkit (and so each distributed worker) has its own Resolver: nothing is shared between them.
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self, ttl: float = 300, negative_ttl: float = 30, min_ttl: float = 5, max_ttl: float = 3600):
+        """
+        Initialize the Resolver class.
+
+        :param ttl: Lifetime in seconds of an entry without a known TTL (system resolver). Default is 300.
+        :param negative_ttl: Lifetime in seconds of a failed lookup. Default is 30.
+        :param min_ttl: Lower bound for record TTLs, so a TTL of 0 does not disable the cache. Default is 5.
+        :param max_ttl: Upper bound for record TTLs. Default is 3600.
+        """
+
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+
+        self.cache = {}  # host -> (addresses or the lookup error, expiry on the monotonic clock)
+        self.lock = threading.Lock()
+        self.lookups = {}  # host -> lock held by the thread looking it up
+
+        # Counters, for monitoring the cache.
+        self.stats = {'hits': 0, 'misses': 0, 'failures': 0}
+
+    def __len__(self):
+        """Return the number of cached names."""
+        return len(self.cache)
+
+    def __repr__(self):
+        """Return a representation of the Resolver instance."""
+        return f"Resolver | Names: {len(self)} | Stats: {self.stats}"
+
+    # Resolve: Addresses
+    def addresses(self, host: str) -> list:
+        """
+        Return every address of a name, from the cache when fresh.
+
+        :param host: Hostname (an IP address is returned as it is).
+        :return: List of IP address strings, IPv4 first.
+        :raises OSError: If the name does not resolve (socket.gaierror, also served from the cache).
+        """
+
+        try:
+            return [str(ipaddress.ip_address(host))]
+        except ValueError:
+            pass
+
+        host = host.lower()
+
+        entry = self.cached(host)
+        if entry is not None:
+            return self.unpack(entry)
+
+        # One lookup per name: the other threads wait for it instead of querying too.
+        with self.lock:
+            lookup = self.lookups.setdefault(host, threading.Lock())
+
+        with lookup:
+            entry = self.cached(host)
+            if entry is not None:
+                return self.unpack(entry)
+
+            with self.lock:
+                self.stats['misses'] += 1
+
+            try:
+                result, ttl = self.query(host)
+            except OSError as e:
+                result, ttl = e, self.negative_ttl
+                with self.lock:
+                    self.stats['failures'] += 1
+
+            with self.lock:
+                self.cache[host] = (result, time.monotonic() + ttl)
+                self.lookups.pop(host, None)
+
+        return self.unpack((result, 0))
+
+    def resolve(self, host: str, family: int = socket.AF_UNSPEC) -> str:
+        """
+        Return the first address of a name.
+
+        :param host: Hostname or IP address.
+        :param family: socket.AF_INET for an IPv4 address only (SOCKS4). Default is any family.
+        :return: IP address as a string.
+        :raises OSError: If the name does not resolve (or has no address of that family).
+        """
+
+        for address in self.addresses(host):
+            if family == socket.AF_UNSPEC or (family == socket.AF_INET) == (':' not in address):
+                return address
+
+        version = 'IPv4' if family == socket.AF_INET else 'IPv6'
+        raise socket.gaierror(socket.EAI_NONAME, f'No {version} address for {host}')
+
+    # Resolve: Warm up
+    def prime(self, hosts) -> dict:
+        """
+        Resolve names ahead of the checks (failures are cached and reported, not raised).
+
+        :param hosts: Iterable of hostnames.
+        :return: Dictionary {host: list of addresses, or the error message}.
+        """
+
+        primed = {}
+        for host in hosts:
+            try:
+                primed[host] = self.addresses(host)
+            except OSError as e:
+                primed[host] = str(e)
+        return primed
+
+    # Cache
+    def cached(self, host: str) -> tuple | None:
+        """Return the fresh cache entry of a name (counting the hit), or None."""
+        with self.lock:
+            entry = self.cache.get(host)
+            if entry is None or entry[1] <= time.monotonic():
+                return None
+            self.stats['hits'] += 1
+            return entry
+
+    @staticmethod
+    def unpack(entry: tuple) -> list:
+        """Return the addresses of a cache entry, or raise its cached lookup error."""
+        if isinstance(entry[0], OSError):
+            raise entry[0]
+        return entry[0]
+
+    def clear(self) -> None:
+        """Forget every cached name."""
+        with self.lock:
+            self.cache.clear()
+
+    # Lookup
+    def query(self, host: str) -> tuple:
+        """
+        Look a name up, bypassing the cache.
+
+        :param host: Hostname.
+        :return: Tuple (list of addresses with IPv4 first, TTL in seconds).
+        :raises OSError: If the name does not resolve.
+        """
+
+        if dns_resolver is not None:
+            addresses, ttls = [], []
+            for record in ('A', 'AAAA'):
+                try:
+                    answer = dns_resolver.resolve(host, record)
+                except dns_exception.DNSException:
+                    continue
+                addresses += [rdata.address for rdata in answer]
+                ttls.append(answer.rrset.ttl)
+
+            if not addresses:
+                raise socket.gaierror(socket.EAI_NONAME, f'Name or service not known: {host}')
+
+            return addresses, min(max(min(ttls), self.min_ttl), self.max_ttl)
+
+        infos = socket.getaddrinfo(host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        addresses = []
+        for family, _, _, _, sockaddr in sorted(infos, key=lambda info: info[0] != socket.AF_INET):
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+
+        return addresses, self.ttl
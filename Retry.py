@@ -0,0 +1,240 @@
+import random  # For backoff jitter.
+import threading  # For keeping the counters consistent across threads.
+import time  # For backoff sleeps and breaker timing.
+
+
+class RetryPolicy:
+    """
+    RetryPolicy Module.
+    Retries a call with exponential backoff and full jitter, and counts what the retries cost.
+
+    The delay before retry N is a random value between 0 and min(cap, base * 2 ** N), so bursts of
+    failing callers spread out instead of retrying in lockstep.
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self, attempts: int = 3, base: float = 0.5, cap: float = 8.0, jitter: bool = True):
+        """
+        Initialize the RetryPolicy class.
+
+        :param attempts: Maximum number of attempts, including the first one (1 disables retries).
+        :param base: Base delay in seconds of the exponential backoff.
+        :param cap: Maximum delay in seconds between two attempts.
+        :param jitter: Boolean flag to randomize the delays (full jitter). Default is True.
+        """
+
+        self.attempts = max(1, attempts)
+        self.base = base
+        self.cap = cap
+        self.jitter = jitter
+        self.lock = threading.Lock()
+
+        # Counters: how many calls, attempts and retries, how many retries paid off, and the time they cost.
+        self.stats = {'calls': 0, 'attempts': 0, 'retries': 0, 'recovered': 0, 'gave_up': 0, 'retry_time': 0.0}
+
+    def __repr__(self):
+        """Return a representation of the RetryPolicy instance."""
+        return f"RetryPolicy attempts={self.attempts} base={self.base}s cap={self.cap}s | Stats: {self.stats}"
+
+    def count(self, key: str, value: float = 1) -> None:
+        """Add a value to one of the counters."""
+        with self.lock:
+            self.stats[key] += value
+
+    # Backoff: Delay
+    def delay(self, retry: int) -> float:
+        """
+        Return the delay before a retry.
+
+        :param retry: Retry number (1 for the first retry).
+        :return: Delay in seconds.
+        """
+
+        ceiling = min(self.cap, self.base * 2 ** (retry - 1))
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+    # Run: Call
+    def run(self, func, retry_if, success_if=None, wait_hint=None):
+        """
+        Call 'func' until it succeeds, the failure is not worth retrying, or the attempts run out.
+
+        :param func: Callable without arguments.
+        :param retry_if: Callable (result, error) -> bool; True if the outcome should be retried.
+        :param success_if: Optional callable (result) -> bool telling a real success, for the 'recovered' counter.
+                           By default, any outcome without an exception is a success.
+        :param wait_hint: Optional callable (result, error) -> float | None, a minimum delay asked by the
+                          remote side (e.g. a 'Retry-After' header).
+        :return: The result of the last attempt (its exception is raised instead, if it raised one).
+        """
+
+        self.count('calls')
+        result, error = None, None
+
+        for attempt in range(self.attempts):
+            if attempt:
+                # Back off before the retry; honour the remote hint if it asks for longer.
+                delay = self.delay(attempt)
+                hint = wait_hint(result, error) if wait_hint else None
+                if hint:
+                    delay = min(max(delay, hint), self.cap)
+
+                self.count('retries')
+                self.count('retry_time', delay)
+                time.sleep(delay)
+
+            timer = time.monotonic()
+            result, error = None, None
+
+            try:
+                result = func()
+            except Exception as e:
+                error = e
+
+            self.count('attempts')
+            if attempt:
+                self.count('retry_time', time.monotonic() - timer)
+
+            if not retry_if(result, error):
+                if attempt and error is None and (success_if is None or success_if(result)):
+                    self.count('recovered')
+                break
+
+        else:
+            self.count('gave_up')
+
+        if error is not None:
+            raise error
+
+        return result
+
+
+class CircuitBreakerOpen(Exception):
+    """Raised when a call is refused because the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    CircuitBreaker Module.
+    Stops calling an endpoint that keeps failing, and probes it again after a cool-down.
+
+    - Closed: calls go through; 'threshold' consecutive failures open the breaker.
+    - Open: calls are refused right away until 'reset_timeout' seconds have passed.
+    - Half-open: one trial call goes through; success closes the breaker, failure opens it again.
+
+
+    Author: NightFox
+    Powered-by: Python3
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        Initialize the CircuitBreaker class.
+
+        :param threshold: Consecutive failures that open the breaker.
+        :param reset_timeout: Seconds to wait before a trial call once the breaker is open.
+        """
+
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0  # Consecutive failures.
+        self.opened_at = None  # Monotonic time the breaker opened, None while closed.
+        self.trial = False  # True while the half-open trial call runs.
+        self.lock = threading.Lock()
+
+        # Counters: how often the breaker opened and how many calls it refused.
+        self.stats = {'opened': 0, 'rejected': 0}
+
+    def __repr__(self):
+        """Return a representation of the CircuitBreaker instance."""
+        return f"CircuitBreaker {self.state} failures={self.failures}/{self.threshold} | Stats: {self.stats}"
+
+    # State
+    @property
+    def state(self) -> str:
+        """Return the breaker state: 'closed', 'open' or 'half-open'."""
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    # Allow: Call
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through now (in half-open state, only one trial call may).
+
+        :return: True if the call may go through.
+        """
+
+        with self.lock:
+            state = self.state
+
+            if state == 'closed':
+                return True
+
+            if state == 'half-open' and not self.trial:
+                self.trial = True
+                return True
+
+            self.stats['rejected'] += 1
+            return False
+
+    # Record: Success
+    def success(self) -> None:
+        """Record a successful call and close the breaker."""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    # Record: Failure
+    def failure(self) -> None:
+        """Record a failed call; open the breaker on a failed trial or when the threshold is reached."""
+        with self.lock:
+            self.failures += 1
+
+            if self.trial or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self.stats['opened'] += 1
+
+            self.trial = False
+
+
+# Error markers of "borderline" check failures: the proxy accepted the connection, then dropped or
+# stalled it. These are often transient (packet loss, a busy proxy), unlike refused or unreachable proxies.
+BORDERLINE_MARKERS = (
+    'connection reset',
+    'connectionreseterror',
+    'connection aborted',
+    'connectionabortederror',
+    'remotedisconnected',
+    'remote end closed connection',
+    'connection broken',
+    'chunkedencodingerror',
+    'connection closed unexpectedly',
+    'read timed out',
+    'handshake: timed out',  # Probe errors name the phase: a timeout after the TCP connect.
+    'tls: timed out',
+    'ttfb: timed out',
+    'transfer: timed out',
+)
+
+
+def is_borderline(error) -> bool:
+    """
+    Check whether a check failure is borderline (worth one more attempt).
+
+    :param error: The exception, or its message (the 'error' field of a check result).
+    :return: True for resets, aborts and read timeouts after the connection was made.
+    """
+
+    if error is None:
+        return False
+
+    text = f'{type(error).__name__}: {error}' if isinstance(error, BaseException) else str(error)
+    text = text.lower()
+
+    return any(marker in text for marker in BORDERLINE_MARKERS)
@@ -1,10 +1,20 @@
-import requests  # For making HTTP/HTTPS requests.
 import time  # For measuring response time (ping).
-import socket  # For handling socket operations for SOCKS proxy.
-import socks  # For handling SOCKS proxy setup.
 import json  # For handling JSON files.
+import math  # For scoring proxies by freshness.
 import Art  # Add ASCII arts.
-from requests.exceptions import ProxyError, Timeout, RequestException  # For handling specific exceptions from requests.
+import Network  # For validating and classifying proxy addresses before checking.
+import Retry  # For retrying borderline proxy checks with backoff.
+import Resolver  # For resolving the check targets once per run (light: dnspython is only imported on use).
+from Lazy import LazyModule  # For importing heavy dependencies only when they are used.
+
+# Heavy dependencies, imported on first use only (short runs that never need them skip their import cost).
+requests = LazyModule('requests')  # For HTTP API requests (proxy checks use raw sockets, see Probe).
+futures = LazyModule('concurrent.futures')  # For checking proxies concurrently.
+Gateway = LazyModule('Gateway')  # For serving the proxy list through a local rotating gateway.
+History = LazyModule('History')  # For recording check outcomes over time.
+Probe = LazyModule('Probe')  # For every proxy check: raw-socket probes with per-phase timings.
+Distributed = LazyModule('Distributed')  # For checking across many nodes (coordinator/worker).
+Records = LazyModule('Records')  # For reading Geonode metadata values (numbers, ISO dates).
 
 
 class Toolkit:
@@ -23,6 +33,13 @@ class Toolkit:
 
         self.proxies = []  # List to store proxies.
         self.view = "https://www.google.com"  # URL to test proxy connection.
+        self.blocklist = None  # Network.NetworkIndex of networks that must never be used.
+        self.allowlist = None  # Network.NetworkIndex of the only networks allowed (None allows all).
+        self.asn_map = None  # Network.NetworkIndex mapping networks to ASNs (offline).
+        self.blocked_asns = set()  # ASNs that must never be used ('AS13335').
+        self.check_retry = Retry.RetryPolicy(attempts=2, base=0.25, cap=1.0)  # Second chance for borderline checks.
+        self.history = None  # History.History store of past checks (see open_history).
+        self.resolver = Resolver.Resolver()  # Target pre-resolution cache (None resolves in every check).
 
     def __len__(self):
         """Return the number of proxies in the list."""
@@ -153,12 +170,148 @@ class Toolkit:
             # Output error message with details of the exception.
             self.echo(f"[Error:] Reading file error '{path}'\n{e}", color="red")
 
+    # Classify: Proxies
+    def classify_proxies(self, proxy_list: list, reserved: bool = True) -> list:
+        """
+        Classify proxies without touching the network (syntax, port, protocol, reserved networks,
+        blocklist, allowlist and blocked ASNs). Proxies given by a valid hostname are kept (see Network).
+
+        :param proxy_list: List of proxies, where each proxy is a dictionary containing 'ip', 'port', and 'protocol'.
+        :param reserved: Boolean flag to reject reserved, private and bogon networks. Default is True.
+        :return: List of reasons in the same order: None for a valid proxy, otherwise why it is rejected.
+        """
+
+        return Network.classify_proxies(
+            proxy_list,
+            blocked=[self.blocklist] if self.blocklist is not None else None,
+            allowed=self.allowlist,
+            asn_map=self.asn_map,
+            blocked_asns=self.blocked_asns,
+            reserved=reserved,
+        )
+
+    # Filter: Proxies
+    def filter_proxies(self, proxy_list: list, verbose: bool = True) -> list:
+        """
+        Pre-filter proxies before they reach the checker.
+        Rejects malformed IPs, invalid ports, unsupported protocols and reserved/bogon networks
+        (private, loopback, link-local, multicast, documentation...), without touching the network.
+        Also applies the loaded blocklist, allowlist and blocked ASNs.
+
+        :param proxy_list: List of proxies, where each proxy is a dictionary containing 'ip', 'port', and 'protocol'.
+        :param verbose: Boolean flag to indicate if the filter summary should be printed. Default is True.
+        :return: List of the proxies that passed the filter, in their original order.
+        """
+
+        # Classify every proxy in one pass; None means the proxy is valid.
+        reasons = self.classify_proxies(proxy_list)
+
+        # Keep only the valid proxies.
+        proxies_list = [proxy for proxy, reason in zip(proxy_list, reasons) if reason is None]
+
+        if verbose:
+            # Count the rejected proxies per reason.
+            rejected = {}
+            for reason in reasons:
+                if reason is not None:
+                    rejected[reason] = rejected.get(reason, 0) + 1
+
+            details = ', '.join(f'{reason}: {count}' for reason, count in rejected.items())
+            self.echo(f'Pre-filter: {len(proxies_list)} kept, {len(proxy_list) - len(proxies_list)} rejected',
+                      end=f' ({details})\n' if details else '\n')
+
+        return proxies_list
+
+    # Load: Blocklist
+    def load_blocklist(self, path: str) -> None:
+        """
+        Load a blocklist file (one CIDR, IP address or 'START END' range per line); proxies inside these networks are never used.
+        Can be called several times to merge files.
+
+        :param path: Path to the CIDR file.
+        :return: None
+        """
+
+        self.echo(f'Loading blocklist ({path}):', end=' ')
+
+        try:
+            if self.blocklist is None:
+                self.blocklist = Network.NetworkIndex()
+            self.blocklist.load(path, label='blocklist')
+            self.echo(f'{len(self.blocklist)} ranges', color='green', bgcolor='darkgray', end='\n')
+
+        except Exception as e:
+            self.echo('Unsuccessful', color='red', bgcolor='darkgray', end='\n')
+            self.echo(f"[Error:] Loading blocklist '{path}'\n{e}", color="red")
+
+    # Load: Allowlist
+    def load_allowlist(self, path: str) -> None:
+        """
+        Load an allowlist file (one CIDR, IP address or 'START END' range per line); only proxies inside these networks are used.
+        Can be called several times to merge files.
+
+        :param path: Path to the CIDR file.
+        :return: None
+        """
+
+        self.echo(f'Loading allowlist ({path}):', end=' ')
+
+        try:
+            if self.allowlist is None:
+                self.allowlist = Network.NetworkIndex()
+            self.allowlist.load(path, label='allowlist')
+            self.echo(f'{len(self.allowlist)} ranges', color='green', bgcolor='darkgray', end='\n')
+
+        except Exception as e:
+            self.echo('Unsuccessful', color='red', bgcolor='darkgray', end='\n')
+            self.echo(f"[Error:] Loading allowlist '{path}'\n{e}", color="red")
+
+    # Load: ASN map
+    def load_asn_map(self, path: str, blocked_asns: list = None) -> None:
+        """
+        Load an offline IP-to-ASN mapping file ('CIDR ASN' or ip2asn-style 'START_IP END_IP ASN ...' lines),
+        so whole providers can be blocked by AS number.
+
+        :param path: Path to the ASN mapping file.
+        :param blocked_asns: Optional list of AS numbers to block ('AS13335' or 13335).
+        :return: None
+        """
+
+        self.echo(f'Loading ASN map ({path}):', end=' ')
+
+        try:
+            self.asn_map = Network.NetworkIndex.from_asn_file(path)
+            self.echo(f'{len(self.asn_map)} ranges', color='green', bgcolor='darkgray', end='\n')
+
+        except Exception as e:
+            self.echo('Unsuccessful', color='red', bgcolor='darkgray', end='\n')
+            self.echo(f"[Error:] Loading ASN map '{path}'\n{e}", color="red")
+
+        self.block_asns(blocked_asns or [])
+
+    # Block: ASNs
+    def block_asns(self, asns: list) -> None:
+        """
+        Block proxies by AS number (needs an ASN map, see load_asn_map).
+
+        :param asns: List of AS numbers ('AS13335' or 13335).
+        :return: None
+        """
+
+        for asn in asns:
+            normalized = Network.normalize_asn(asn)
+            if normalized:
+                self.blocked_asns.add(normalized)
+            else:
+                self.echo(f"[Error:] Invalid ASN '{asn}'", color="red")
+
     # Import: TXT
-    def import_standard_txt(self, path: str) -> list:
+    def import_standard_txt(self, path: str, prefilter: bool = True) -> list:
         """
         Imports proxies from a standard TXT file.
 
         :param path: The path to the TXT file containing proxy information.
+        :param prefilter: Boolean flag to drop invalid and reserved proxies right away. Default is True.
         :return: A list of dictionaries containing proxy details (IP, port, protocol).
         """
 
@@ -188,6 +341,10 @@ class Toolkit:
             # Verbose output to indicate successful extraction.
             self.echo('Successful', color='green', bgcolor='darkgray', end='\n')
 
+            # Drop the proxies that can never pass the check.
+            if prefilter:
+                proxies_list = self.filter_proxies(proxies_list)
+
             # Return the list of extracted proxies.
             return proxies_list
 
@@ -199,11 +356,12 @@ class Toolkit:
             self.echo(f"[Error:] Reading proxies error\n{e}", color="red")
 
     # Import: JSON
-    def import_standard_json(self, path: str) -> list:
+    def import_standard_json(self, path: str, prefilter: bool = True) -> list:
         """
         Imports proxies from a standard JSON file.
 
         :param path: The path to the JSON file containing proxy information.
+        :param prefilter: Boolean flag to drop invalid and reserved proxies right away. Default is True.
         :return: A list of dictionaries containing proxy details (IP, port, protocol).
         """
 
@@ -233,6 +391,10 @@ class Toolkit:
             # Verbose output to indicate successful extraction.
             self.echo('Successful', color='green', bgcolor='darkgray', end='\n')
 
+            # Drop the proxies that can never pass the check.
+            if prefilter:
+                proxies_list = self.filter_proxies(proxies_list)
+
             # Return the list of extracted proxies.
             return proxies_list
 
@@ -244,7 +406,8 @@ class Toolkit:
             print(f"[Error:] Reading proxy information from JSON file: {e}")
 
     # Core: SOCKS
-    def check_socks_proxy(self, ip: str, port: int, protocol: str, timeout: int = 9) -> dict:
+    def check_socks_proxy(self, ip: str, port: int, protocol: str, timeout: int = 9, verbose: bool = True,
+                           cancel=None) -> dict:
         """
         Check the status of a SOCKS proxy.
 
@@ -252,60 +415,19 @@ class Toolkit:
         :param port: Port number of the SOCKS proxy.
         :param protocol: Protocol type ('socks4' or 'socks5').
         :param timeout: Timeout in seconds for the proxy check.
-        :return: Dictionary with proxy status information.
+        :param verbose: Boolean flag to indicate if the proxy status should be printed. Default is True.
+        :param cancel: Optional Probe.Cancel that stops the check early. Default is None.
+        :return: Dictionary with proxy status information, including the timing of every phase ('phases').
         """
 
-        # Verbose output to indicate the start of the proxy status check.
-        self.echo(f'Proxy status:', end=' ')
-
-        # Determine SOCKS protocol type based on the provided protocol.
-        proxy_type = socks.SOCKS4 if protocol.lower() == 'socks4' else socks.SOCKS5
-
-        # Set up SOCKS proxy with the specified parameters.
-        socks.set_default_proxy(proxy_type, ip, int(port))
-
-        # Patch the socket module to use the SOCKS proxy.
-        socket.socket = socks.socksocket
-
-        # Record the start time for the proxy check.
-        timer = time.time()
-
-        try:
-            # Make a GET request through the proxy to a test URL.
-            response = requests.get(self.view, timeout=timeout)
-
-            # Verbose output indicating the proxy is online.
-            self.echo('Online', color='green', end='\n')
-
-            # Return status information if the request succeeds.
-            return {
-                'info': {'ip': ip, 'port': port, 'protocol': protocol},
-                'alive': True,
-                'status_code': response.status_code,
-                'content': response.text,
-                'time': time.time() - timer
-            }
-
-        except (ProxyError, Timeout, RequestException, ConnectionError) as e:
-            # Verbose output indicating the proxy is offline.
-            self.echo('Offline', color='red', end='\n')
-
-            # Handle exceptions and return status information indicating failure.
-            return {
-                'info': {'ip': ip, 'port': port, 'protocol': protocol},
-                'alive': False,
-                'status_code': None,
-                'content': None,
-                'time': time.time() - timer,
-                'error': str(e)
-            }
-
-        finally:
-            # Reset default proxy settings to None after the request is complete.
-            socks.set_default_proxy(None)
+        # Fetch the test URL through the proxy, over a raw socket so every phase can be timed.
+        # (The proxy is per connection, not on the global socket module, so checks can run concurrently.)
+        return self.probe_the_proxy(ip=ip, port=port, protocol=protocol, depth='full', timeout=timeout,
+                                    verbose=verbose, cancel=cancel)
 
     # Core: HTTPS
-    def check_http_proxy(self, ip: str, port: int, protocol: str, timeout: int = 9) -> dict:
+    def check_http_proxy(self, ip: str, port: int, protocol: str, timeout: int = 9, verbose: bool = True,
+                          cancel=None) -> dict:
         """
         Check the status of an HTTP/HTTPS proxy.
 
@@ -313,50 +435,46 @@ class Toolkit:
         :param port: Port number of the HTTP/HTTPS proxy.
         :param protocol: Protocol type ('http' or 'https').
         :param timeout: Timeout in seconds for the proxy check.
-        :return: Dictionary with proxy status information.
+        :param verbose: Boolean flag to indicate if the proxy status should be printed. Default is True.
+        :param cancel: Optional Probe.Cancel that stops the check early. Default is None.
+        :return: Dictionary with proxy status information, including the timing of every phase ('phases').
         """
 
-        # Verbose output to indicate the start of the proxy status check.
-        self.echo(f'Proxy status:', end=' ')
-
-        # Construct the proxy dictionary for HTTP and HTTPS.
-        proxies = {
-            "http": f"http://{ip}:{int(port)}",
-            "https": f"http://{ip}:{int(port)}"
-        }
+        # Fetch the test URL through the proxy, over a raw socket so every phase can be timed.
+        return self.probe_the_proxy(ip=ip, port=port, protocol=protocol, depth='full', timeout=timeout,
+                                    verbose=verbose, cancel=cancel)
 
-        # Record the start time for the proxy check.
-        timer = time.time()
+    # Core: Probe
+    def probe_the_proxy(self, ip: str, port: int, protocol: str, depth: str = 'handshake', timeout: int = 9,
+                        verbose: bool = True, cancel=None) -> dict:
+        """
+        Probe a proxy over a raw socket, timing every phase (see Probe.probe).
 
-        try:
-            # Make a GET request through the proxy to a test URL.
-            response = requests.get(self.view, proxies=proxies, timeout=timeout)
+        :param ip: IP address of the proxy.
+        :param port: Port number of the proxy.
+        :param protocol: Protocol type ('http', 'https', 'socks4' or 'socks5').
+        :param depth: 'connect' (the proxy accepts TCP connections), 'handshake' (it also agrees to open
+                      a tunnel to the test URL's host) or 'full' (the test URL is fetched through it).
+                      Default is 'handshake'.
+        :param timeout: Timeout in seconds for each step of the probe.
+        :param verbose: Boolean flag to indicate if the proxy status should be printed. Default is True.
+        :param cancel: Optional Probe.Cancel that stops the probe between phases and shuts its socket down.
+        :return: Dictionary with proxy status information, with the phase timings in 'phases' (seconds)
+                 and the number of response bytes read in 'bytes'.
+        """
 
-            # Verbose output indicating the proxy is online.
-            self.echo('Online', color='green', end='\n')
+        # Verbose output to indicate the start of the proxy status check.
+        if verbose:
+            self.echo(f'Proxy status:', end=' ')
 
-            # Return status information if the request succeeds.
-            return {
-                'info': {'ip': ip, 'port': port, 'protocol': protocol.lower()},
-                'alive': True,
-                'status_code': response.status_code,
-                'content': response.text,
-                'time': time.time() - timer
-            }
+        result = Probe.probe(ip, port, protocol, self.view, depth=depth, timeout=timeout, resolver=self.resolver,
+                             cancel=cancel)
 
-        except (ProxyError, Timeout, RequestException, ConnectionError) as e:
-            # Verbose output indicating the proxy is offline.
-            self.echo('Offline', color='red', end='\n')
+        # Verbose output indicating the proxy status.
+        if verbose:
+            self.echo('Online' if result['alive'] else 'Offline', color='green' if result['alive'] else 'red', end='\n')
 
-            # Handle exceptions and return status information indicating failure.
-            return {
-                'info': {'ip': ip, 'port': port, 'protocol': protocol.lower()},
-                'alive': False,
-                'status_code': None,
-                'content': None,
-                'time': time.time() - timer,
-                'error': str(e)
-            }
+        return result
 
     # Present: theProxy
     def present_the_proxy(self, response: dict) -> None:
@@ -374,6 +492,7 @@ class Toolkit:
             self.echo(f"[Alive:] {response['alive']}", color="green", bgcolor="darkgray")
             self.echo(f"[Code:] {response['status_code']}", color="green", bgcolor="darkgray")
             self.echo(f"[Time:] {response['time']}", color="green", bgcolor="darkgray")
+            self.echo(f"[Phases:] {self.format_phases(response)}", color="green", bgcolor="darkgray")
             self.echo(f"[Content:] {response['content'][:125]}...", bgcolor="darkgray")
 
         # Check if the proxy is alive but the status code is not 200, print the details in blue.
@@ -382,6 +501,7 @@ class Toolkit:
             self.echo(f"[Alive:] {response['alive']}", color="blue", bgcolor="darkgray")
             self.echo(f"[Code:] {response['status_code']}", color="blue", bgcolor="darkgray")
             self.echo(f"[Time:] {response['time']}", color="blue", bgcolor="darkgray")
+            self.echo(f"[Phases:] {self.format_phases(response)}", color="blue", bgcolor="darkgray")
             self.echo(f"[Content:] {response['content'][:125]}...", bgcolor="darkgray")
 
         # If the proxy is not alive, print the details in red, including any error message.
@@ -390,8 +510,26 @@ class Toolkit:
             self.echo(f"[Alive:] {response['alive']}", color="red", bgcolor="darkgray")
             self.echo(f"[Code:] {response['status_code']}", color="red", bgcolor="darkgray")
             self.echo(f"[Time:] {response['time']}", color="red", bgcolor="darkgray")
+            self.echo(f"[Phases:] {self.format_phases(response)}", color="red", bgcolor="darkgray")
             self.echo(f"[Error:] {response['error'][:125]}...", color="red", bgcolor="darkgray")
 
+    # Present: Phases
+    @staticmethod
+    def format_phases(response: dict) -> str:
+        """
+        Format the phase timings of a check result, e.g. 'connect 12.1ms | handshake 80.4ms | ttfb 210.0ms'.
+
+        :param response: Dictionary containing proxy status information.
+        :return: The formatted timings (with the bytes read), or '-' if the result has none.
+        """
+
+        phases = response.get('phases') or {}
+        if not phases:
+            return '-'
+
+        text = ' | '.join(f'{phase} {phases[phase] * 1000:.1f}ms' for phase in Probe.PHASES if phase in phases)
+        return f"{text} | {response.get('bytes', 0)} bytes"
+
     # Add: theProxy
     def add_the_proxy(self, response: dict, verbose: bool = True) -> None:
         """
@@ -408,8 +546,17 @@ class Toolkit:
         if verbose:
             self.present_the_proxy(response=response)
 
+        # Never add a proxy from a blocked network, even if it was checked directly.
+        # (Reserved networks are only rejected at import, so local proxies can still be checked on purpose.)
+        reason = None
+        if self.blocklist is not None or self.allowlist is not None or self.blocked_asns:
+            reason = self.classify_proxies([response['info']], reserved=False)[0]
+
+        if response['alive'] and reason is not None:
+            self.echo(f'Proxy rejected ({reason}).', color='red')
+
         # Check if the proxy is alive
-        if response['alive']:
+        elif response['alive']:
             # Create a proxy dictionary with relevant details
             proxy = {
                 'ip': response['info']['ip'],
@@ -417,6 +564,8 @@ class Toolkit:
                 'protocol': response['info']['protocol'],
                 'code': response['status_code'],
                 'ping': response['time'],
+                'phases': response.get('phases', {}),
+                'bytes': response.get('bytes', 0),
             }
 
             # Append the proxy to the proxies list
@@ -429,7 +578,8 @@ class Toolkit:
         self.echo(end='\n')
 
     # Check: theProxy
-    def check_the_proxy(self, ip: str, port: int, protocol: str, timeout: int = 9) -> dict:
+    def check_the_proxy(self, ip: str, port: int, protocol: str, timeout: int = 9, verbose: bool = True,
+                        depth: str = 'full', cancel=None) -> dict:
         """
         Checks the status of a single proxy based on its protocol.
 
@@ -437,17 +587,24 @@ class Toolkit:
         :param port: Port number of the proxy.
         :param protocol: Protocol used by the proxy (http, https, socks4, socks5).
         :param timeout: Timeout for the proxy check in seconds. Default is 9 seconds.
+        :param verbose: Boolean flag to indicate if the proxy status should be printed. Default is True.
+        :param depth: How deep to check: 'connect', 'handshake' (see probe_the_proxy) or 'full' (an HTTP request
+                      through the proxy). Default is 'full'.
+        :param cancel: Optional Probe.Cancel that stops the check (and its retries) early. Default is None.
         :return: Dictionary with proxy status information.
+
+        Borderline failures (connection reset, aborted or read timeout after the proxy accepted the connection)
+        are retried according to 'self.check_retry'; refused and unreachable proxies are not.
         """
 
         try:
             # Check if the protocol is either 'http' or 'https'
             if protocol.lower() in ['http', 'https']:
-                return self.check_http_proxy(ip=ip, port=port, protocol=protocol, timeout=timeout)
+                check = self.check_http_proxy
 
             # Check if the protocol is either 'socks4' or 'socks5'
             elif protocol.lower() in ['socks4', 'socks5']:
-                return self.check_socks_proxy(ip=ip, port=port, protocol=protocol, timeout=timeout)
+                check = self.check_socks_proxy
 
             else:
                 # Handle unsupported protocols
@@ -461,6 +618,20 @@ class Toolkit:
                     'error': 'Unsupported protocol'
                 }
 
+            # Shallow checks stop after the TCP connect or the proxy handshake
+            if depth != 'full':
+                check = lambda **kwargs: self.probe_the_proxy(depth=depth, **kwargs)
+
+            # Check the proxy, with a second chance for borderline failures only
+            return self.check_retry.run(
+                lambda: check(ip=ip, port=port, protocol=protocol, timeout=timeout, verbose=verbose, cancel=cancel),
+                retry_if=lambda result, error: (
+                    error is None and not result['alive'] and Retry.is_borderline(result.get('error'))
+                    and not (cancel is not None and cancel.is_set())
+                ),
+                success_if=lambda result: result['alive'],
+            )
+
         except Exception as e:
             # Handle general exceptions
             self.echo(f"[Error:] Proxy server error\n{e}", color="red")
@@ -474,23 +645,35 @@ class Toolkit:
             }
 
     # Check: Proxies
-    def check_the_proxies(self, proxy_list: list, timeout: int = 9, verbose: bool = True) -> None:
+    def check_the_proxies(self, proxy_list: list, timeout: int = 9, verbose: bool = True, banner: bool = True) -> None:
         """
         Checks the status of multiple proxies and adds them to the list if they are alive.
 
         :param proxy_list: List of proxies to check, where each proxy is a dictionary containing 'ip', 'port', and 'protocol'.
         :param timeout: Timeout for the proxy check in seconds. Default is 9 seconds.
         :param verbose: Boolean flag to indicate if detailed proxy information should be printed. Default is True.
+        :param banner: Boolean flag to display the logos (with a short pause) before and after. Default is True.
         :return: None
+
+        With a history store open (see open_history), historically reliable proxies are checked first,
+        chronic failures are skipped, and every check outcome is recorded.
         """
 
-        # Display the initial logo/art
-        self.echo(Art.default_logo)
-        time.sleep(1)
+        # Reliable proxies first, chronic failures out
+        if self.history is not None:
+            proxy_list = self.order_by_history(proxy_list)
+
+        # Resolve the test URL once, not in every check
+        self.prime_the_view(verbose=verbose)
+
+        if banner:
+            # Display the initial logo/art
+            self.echo(Art.default_logo)
+            time.sleep(1)
 
-        # Display the initiation logo/art
-        self.echo(Art.initiate_logo)
-        time.sleep(1)
+            # Display the initiation logo/art
+            self.echo(Art.initiate_logo)
+            time.sleep(1)
 
         # Iterate over each proxy in the list
         for flag, proxy in enumerate(proxy_list):
@@ -510,13 +693,397 @@ class Toolkit:
                 # Add the proxy to the list if it is alive
                 self.add_the_proxy(response=result, verbose=verbose)
 
+                # Record the outcome for the next runs
+                if self.history is not None:
+                    self.history.record(result)
+
             except Exception as e:
                 # Handle and print any errors encountered
                 self.echo(f"[Error:] Proxy information.\n{e}", color="red")
                 continue  # Continue with the next proxy in the list
 
         # Display the end logo/art
-        self.echo(Art.end_logo)
+        if banner:
+            self.echo(Art.end_logo)
+
+        # Display the retries, if any borderline check was retried
+        if self.check_retry.stats['retries']:
+            self.echo(f"[Retry:] {self.check_retry.stats}", color="blue")
 
         # Display the final list of proxies
         self.echo(self.__str__())
+
+    # Priority: Scores
+    def priority_scores(self, proxy_list: list) -> list:
+        """
+        Score proxies by how likely they are to pass the check quickly (higher is better).
+
+        The score multiplies three factors between 0 and 1:
+            - reliability: smoothed uptime from the history store, else Geonode 'upTime', else 0.5
+            - freshness: decays with the age of Geonode 'lastChecked' (half-life of one hour), else 0.5
+            - speed: 1 / (1 + response time in seconds), from the history mean latency, else Geonode
+              'responseTime' (or 'speed'), in milliseconds, else 0.5
+
+        Metadata values that cannot be read (e.g. a non-numeric 'upTime') count as missing.
+        'lastChecked' may be a Unix timestamp or an ISO 8601 date.
+
+        :param proxy_list: List of proxies; Geonode metadata keys are used when present
+                           (see Geonode.export_proxies(metadata=True)).
+        :return: List of scores in the same order as 'proxy_list'.
+        """
+
+        summary = self.history.summary(since=7 * 86400) if self.history is not None else {}
+        now = time.time()
+        scores = []
+
+        for proxy in proxy_list:
+            try:
+                past = summary.get((str(proxy.get('ip', '')), int(proxy.get('port', ''))))
+            except (TypeError, ValueError):
+                past = None
+
+            # Metadata, NaN when missing or unreadable
+            up_time = Records.to_float(proxy.get('upTime'))
+            last_checked = Records.to_timestamp(proxy.get('lastChecked'))
+            milliseconds = proxy.get('responseTime')
+            milliseconds = Records.to_float(proxy.get('speed') if milliseconds is None else milliseconds)
+
+            # Reliability
+            if past is not None:
+                reliability = (past['successes'] + 1) / (past['checks'] + 2)
+            elif not math.isnan(up_time):
+                reliability = min(max(up_time / 100, 0.0), 1.0)
+            else:
+                reliability = 0.5
+
+            # Freshness
+            if not math.isnan(last_checked):
+                age = max(now - last_checked, 0.0)
+                freshness = 0.5 + 0.5 * math.exp(-age * math.log(2) / 3600)
+            else:
+                freshness = 0.5
+
+            # Speed
+            if past is not None and past['latency'] is not None:
+                speed = 1 / (1 + past['latency'])
+            elif not math.isnan(milliseconds):
+                speed = 1 / (1 + max(milliseconds, 0.0) / 1000)
+            else:
+                speed = 0.5
+
+            scores.append(reliability * freshness * speed)
+
+        return scores
+
+    # Resolve: View
+    def prime_the_view(self, verbose: bool = True) -> list:
+        """
+        Resolve the host of the test URL ahead of the checks, so they connect by IP from the resolver cache.
+
+        :param verbose: Boolean flag to indicate if the resolved addresses should be printed. Default is True.
+        :return: List of the addresses of the test URL's host (empty if it does not resolve or there is no resolver).
+        """
+
+        if self.resolver is None:
+            return []
+
+        host = Probe.target_of(self.view)[0]
+        addresses = self.resolver.prime([host])[host]
+
+        # A name that does not resolve here is left to the proxies (SOCKS4a, SOCKS5 and CONNECT by name).
+        if isinstance(addresses, str):
+            if verbose:
+                self.echo(f'[Resolver:] {host} does not resolve ({addresses}), the proxies will resolve it', color='red')
+            return []
+
+        if verbose:
+            self.echo(f"[Resolver:] {host} -> {', '.join(addresses)}", color='blue')
+
+        return addresses
+
+    # Stream: Proxies
+    def stream_the_proxies(self, proxies, workers: int = 16, timeout: int = 9, depth: str = 'full',
+                           deadline: float = None):
+        """
+        Check proxies concurrently and yield each result as soon as it is ready (completion order).
+
+        The input is consumed lazily, only as fast as the workers can start checks, so it can be a generator
+        over a huge file or a pipe. Closing the generator (e.g. breaking out of the loop) cancels the queued
+        checks and stops the ones in flight: their sockets are shut down, so the worker threads end within
+        moments instead of at their timeout (a retry backoff or a DNS lookup in progress still runs out first).
+
+        :param proxies: Iterable of proxies, where each proxy is a dictionary containing 'ip', 'port', and 'protocol'.
+        :param workers: Number of concurrent checks. Default is 16.
+        :param timeout: Timeout for each proxy check in seconds. Default is 9 seconds.
+        :param depth: 'connect', 'handshake' or 'full' (see check_the_proxy). Default is 'full'.
+        :param deadline: Stop yielding after this many seconds (wall-clock). Default is None (no deadline).
+        :return: Generator of (proxy, result) tuples.
+        """
+
+        started = time.monotonic()
+        queue = iter(proxies)
+        running = {}  # Future -> proxy, for the checks in flight.
+
+        # Resolve the test URL once, not in every check
+        self.prime_the_view(verbose=False)
+        exhausted = False
+
+        executor = futures.ThreadPoolExecutor(max_workers=workers)
+        cancel = Probe.Cancel()
+
+        try:
+            while True:
+                # Keep every worker busy, without queueing more than the workers can start.
+                while not exhausted and len(running) < workers:
+                    proxy = next(queue, None)
+                    if proxy is None:
+                        exhausted = True
+                        break
+                    future = executor.submit(self.check_the_proxy, ip=proxy.get('ip', ''), port=proxy.get('port', ''),
+                                             protocol=proxy.get('protocol', ''), timeout=timeout, verbose=False,
+                                             depth=depth, cancel=cancel)
+                    running[future] = proxy
+
+                if not running:
+                    return
+
+                # Wait for the next finished check, but never past the deadline.
+                remaining = None if deadline is None else deadline - (time.monotonic() - started)
+                if remaining is not None and remaining <= 0:
+                    return
+
+                finished, _ = futures.wait(running, timeout=remaining, return_when=futures.FIRST_COMPLETED)
+
+                for future in finished:
+                    yield running.pop(future), future.result()
+
+        finally:
+            # Cancel the queued checks and stop the ones in flight; don't wait for them.
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # Schedule: Proxies
+    def schedule_the_proxies(self, proxy_list: list, target: int = None, deadline: float = None, workers: int = 16,
+                             timeout: int = 9, verbose: bool = True, depth: str = 'full') -> list:
+        """
+        Check proxies concurrently, best candidates first, and stop early once enough are alive.
+
+        Candidates are ordered by priority_scores() and checked by stream_the_proxies(). Once 'target'
+        proxies were added or 'deadline' seconds have passed, no new check is started, queued checks are
+        cancelled and the checks still in flight are stopped, their results discarded.
+
+        :param proxy_list: List of proxies to check, where each proxy is a dictionary containing 'ip', 'port', and 'protocol'.
+        :param target: Stop once this many proxies were added to the list. Default is None (check them all).
+        :param deadline: Stop after this many seconds (wall-clock). Default is None (no deadline).
+        :param workers: Number of concurrent checks. Default is 16.
+        :param timeout: Timeout for each proxy check in seconds. Default is 9 seconds.
+        :param verbose: Boolean flag to indicate if detailed proxy information should be printed. Default is True.
+        :param depth: 'connect', 'handshake' or 'full' (see check_the_proxy). Default is 'full'.
+        :return: List of the proxies added to the list by this run, in the order they passed.
+        """
+
+        started = time.monotonic()
+
+        # Best candidates first; the original order breaks ties.
+        scores = self.priority_scores(proxy_list)
+        order = sorted(range(len(proxy_list)), key=lambda flag: -scores[flag])
+
+        stream = self.stream_the_proxies([proxy_list[flag] for flag in order], workers=workers, timeout=timeout,
+                                         depth=depth, deadline=deadline)
+
+        added, checked, reason = self.gather_the_proxies(stream, len(proxy_list), target=target, verbose=verbose)
+
+        self.echo(f'[Schedule:] {len(added)} alive of {checked} checked in {time.monotonic() - started:.2f}s '
+                  f'(stopped: {reason})', color='blue')
+
+        return added
+
+    # Gather: Results
+    def gather_the_proxies(self, stream, total: int, target: int = None, verbose: bool = True) -> tuple:
+        """
+        Add the alive proxies from a stream of check results, until it ends or the target is reached.
+
+        :param stream: Generator of (proxy, result) tuples (stream_the_proxies, or a Coordinator's results_stream).
+        :param total: Number of proxies in the run, for the progress output.
+        :param target: Stop once this many proxies were added to the list. Default is None (gather them all).
+        :param verbose: Boolean flag to indicate if detailed proxy information should be printed. Default is True.
+        :return: Tuple (added proxies, number of checked proxies, stop reason: 'done', 'target' or 'deadline').
+        """
+
+        added = []  # Proxies added by this run.
+        checked = 0
+        reason = 'done'
+
+        for proxy, result in stream:
+            checked += 1
+
+            # Verbose output of the finished check
+            self.echo(f'[{checked}/{total}][{self.__len__()}] '
+                      f"{str(proxy.get('protocol', '')).upper()} {proxy.get('ip', '')}:{proxy.get('port', '')}",
+                      color='blue')
+
+            # Add the proxy to the list if it is alive
+            length = self.__len__()
+            self.add_the_proxy(response=result, verbose=verbose)
+            if self.__len__() > length:
+                added.append(self.proxies[-1])
+
+            # Record the outcome for the next runs
+            if self.history is not None:
+                self.history.record(result)
+
+            if target is not None and len(added) >= target:
+                reason = 'target'
+                break
+
+        # Cancel whatever is left
+        stream.close()
+
+        if reason == 'done' and checked < total:
+            reason = 'deadline'
+
+        return added, checked, reason
+
+    # History: Open
+    def open_history(self, path: str = 'proxy_history.db') -> None:
+        """
+        Open (or create) the local history store; from now on every check outcome is recorded there.
+
+        :param path: Path of the SQLite database file. Default is 'proxy_history.db'.
+        :return: None
+        """
+
+        self.echo(f'Opening history ({path}):', end=' ')
+
+        try:
+            self.history = History.History(path)
+            self.echo(f'{len(self.history)} checks', color='green', bgcolor='darkgray', end='\n')
+
+        except Exception as e:
+            self.echo('Unsuccessful', color='red', bgcolor='darkgray', end='\n')
+            self.echo(f"[Error:] Opening history '{path}'\n{e}", color="red")
+
+    # History: Order
+    def order_by_history(self, proxy_list: list, since: float = 7 * 86400, skip_after: int = 5,
+                         verbose: bool = True) -> list:
+        """
+        Order proxies by their past reliability and drop chronic failures.
+        The score is the smoothed uptime (successes + 1) / (checks + 2), so unknown proxies score 0.5;
+        ties are broken by the lower mean latency.
+
+        :param proxy_list: List of proxies, where each proxy is a dictionary containing 'ip', 'port', and 'protocol'.
+        :param since: History window in seconds. Default is 7 days.
+        :param skip_after: Skip proxies with at least this many checks and no success in the window. Default is 5.
+        :param verbose: Boolean flag to indicate if the summary should be printed. Default is True.
+        :return: The ordered list of proxies (without the chronic failures).
+        """
+
+        if self.history is None:
+            return list(proxy_list)
+
+        summary = self.history.summary(since=since)
+        scored = []
+
+        for flag, proxy in enumerate(proxy_list):
+            try:
+                past = summary.get((str(proxy.get('ip', '')), int(proxy.get('port', ''))))
+            except (TypeError, ValueError):
+                past = None
+
+            if past is None:
+                scored.append((-0.5, float('inf'), flag, proxy))
+            elif past['successes'] or past['checks'] < skip_after:
+                latency = past['latency'] if past['latency'] is not None else float('inf')
+                scored.append((-(past['successes'] + 1) / (past['checks'] + 2), latency, flag, proxy))
+
+        scored.sort(key=lambda item: item[:3])
+
+        if verbose:
+            self.echo(f'History order: {len(scored)} proxies, {len(proxy_list) - len(scored)} chronic failures skipped')
+
+        return [proxy for *_, proxy in scored]
+
+    # Serve: Gateway
+    def serve_gateway(self, host: str = '127.0.0.1', port: int = 8899, timeout: int = 9, verbose: bool = True) -> None:
+        """
+        Serve the alive proxies through a local rotating gateway (HTTP CONNECT and SOCKS5) until interrupted.
+        Each client connection goes through the lowest-latency healthy proxy, with failover to the next one.
+
+        :param host: Local address to listen on. Default is '127.0.0.1'.
+        :param port: Local port to listen on. Default is 8899.
+        :param timeout: Timeout in seconds for opening a tunnel through one proxy. Default is 9 seconds.
+        :param verbose: Boolean flag to indicate if gateway events should be printed. Default is True.
+        :return: None
+        """
+
+        if not self.proxies:
+            self.echo("[Error:] No alive proxies to serve, run check_the_proxies first", color="red")
+            return
+
+        gateway = Gateway.Gateway(self.proxies, host=host, port=port, timeout=timeout,
+                                  echo=self.echo if verbose else None)
+        gateway.run()
+
+    # Distribute: Coordinator
+    def coordinate_the_proxies(self, proxy_list: list, host: str = '127.0.0.1', port: int = 7700, shard_size: int = 64,
+                               timeout: int = 9, depth: str = 'full', target: int = None, deadline: float = None,
+                               verbose: bool = True) -> list:
+        """
+        Check proxies on remote workers (serve_as_worker): shard the list, hand the shards out over TCP
+        and add the alive proxies as their results stream back. Shards of disconnected workers are requeued.
+
+        :param proxy_list: List of proxies to check, where each proxy is a dictionary containing 'ip', 'port', and 'protocol'.
+        :param host: Address to listen on for workers. Default is '127.0.0.1' (this host only;
+                     '0.0.0.0' accepts workers on every interface, which are not authenticated).
+        :param port: Port to listen on for workers. Default is 7700.
+        :param shard_size: Number of proxies per shard. Default is 64.
+        :param timeout: Timeout for each proxy check in seconds. Default is 9 seconds.
+        :param depth: 'connect', 'handshake' or 'full' (see check_the_proxy). Default is 'full'.
+        :param target: Stop once this many proxies were added to the list. Default is None (check them all).
+        :param deadline: Stop after this many seconds (wall-clock). Default is None (no deadline).
+        :param verbose: Boolean flag to indicate if detailed proxy information should be printed. Default is True.
+        :return: List of the proxies added to the list by this run, in the order they passed.
+        """
+
+        started = time.monotonic()
+
+        # Best candidates first, so they land in the first shards.
+        scores = self.priority_scores(proxy_list)
+        order = sorted(range(len(proxy_list)), key=lambda flag: -scores[flag])
+
+        coordinator = Distributed.Coordinator([proxy_list[flag] for flag in order], host=host, port=port,
+                                              shard_size=shard_size, timeout=timeout, depth=depth, view=self.view,
+                                              echo=self.echo)
+        coordinator.start()
+
+        try:
+            added, checked, reason = self.gather_the_proxies(coordinator.results_stream(deadline), len(proxy_list),
+                                                             target=target, verbose=verbose)
+        finally:
+            coordinator.close()
+
+        self.echo(f'[Coordinate:] {len(added)} alive of {checked} checked in {time.monotonic() - started:.2f}s '
+                  f"by {coordinator.stats['workers']} workers ({coordinator.stats['lost']} lost, "
+                  f"{coordinator.stats['requeued']} requeued; stopped: {reason})", color='blue')
+
+        return added
+
+    # Distribute: Worker
+    def serve_as_worker(self, host: str, port: int = 7700, workers: int = 16, verbose: bool = True) -> dict:
+        """
+        Check proxies for a coordinator (coordinate_the_proxies on another node) until it has no work left.
+
+        :param host: Address of the coordinator.
+        :param port: Port of the coordinator. Default is 7700.
+        :param workers: Number of concurrent checks. Default is 16.
+        :param verbose: Boolean flag to indicate if worker events should be printed. Default is True.
+        :return: Dictionary with the worker stats ('shards', 'checked', 'alive').
+        """
+
+        worker = Distributed.Worker(self, host, port=port, workers=workers, echo=self.echo if verbose else None)
+
+        try:
+            return worker.run()
+        except OSError as e:
+            self.echo(f"[Error:] Cannot reach the coordinator at {host}:{port} ({e})", color="red")
+            return worker.stats
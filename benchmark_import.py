@@ -0,0 +1,68 @@
+import importlib.util  # For skipping scenarios whose third-party modules are not installed.
+import statistics  # For the median of the runs.
+import subprocess  # For timing every import in a fresh interpreter (cold start).
+import sys  # For running the same Python interpreter.
+import time  # For measuring wall-clock time.
+
+
+# Snippets to time, each in a fresh interpreter.
+SCENARIOS = {
+    'python (baseline)': 'pass',
+    'import Toolkit': 'import Toolkit',
+    'import Geonode': 'import Geonode',
+    # What the toolkit imported before its lazy imports: requests and PySocks up front, plus Art.
+    'eager dependencies': 'import json, socket, time, requests, socks, Art',
+    'Toolkit + check setup': 'import Toolkit; Toolkit.Toolkit()',
+}
+
+# Third-party modules a scenario needs; without them it is skipped rather than failing.
+REQUIRES = {
+    'eager dependencies': ('requests', 'socks'),
+}
+
+
+def measure(code: str, runs: int) -> float:
+    """
+    Run a snippet in fresh interpreters and return the median wall-clock time.
+
+    :param code: Python code to run with 'python -c'.
+    :param runs: Number of runs.
+    :return: Median time in milliseconds.
+    """
+
+    timings = []
+
+    for _ in range(runs):
+        timer = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True)
+        timings.append(time.perf_counter() - timer)
+
+    return statistics.median(timings) * 1000
+
+
+def main(runs: int = 15) -> None:
+    """
+    Print the cold-start time of every scenario.
+    'eager dependencies' imports what the toolkit imported up front before its lazy imports
+    (skipped when requests or PySocks is not installed).
+
+    :param runs: Number of runs per scenario. Default is 15.
+    :return: None
+    """
+
+    print(f'Cold-start import benchmark ({runs} runs each, median)')
+
+    baseline = None
+    for name, code in SCENARIOS.items():
+        missing = [module for module in REQUIRES.get(name, ()) if importlib.util.find_spec(module) is None]
+        if missing:
+            print(f"  {name:<24} skipped (not installed: {', '.join(missing)})")
+            continue
+
+        median = measure(code, runs)
+        baseline = median if baseline is None else baseline
+        print(f'  {name:<24} {median:8.1f} ms  (+{median - baseline:.1f} ms over bare python)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 15)
@@ -0,0 +1,344 @@
+import argparse  # For the command-line options.
+import itertools  # For putting the sniffed first line back in front of the stream.
+import json  # For JSON and JSON-lines input and output.
+import os  # For silencing stdout once its reader is gone.
+import sys  # For stdin, stdout and stderr streams.
+import time  # For the run statistics.
+
+from Toolkit import Toolkit, Distributed, Network
+
+
+# Formats: Input
+def detect_format(first: str) -> str:
+    """
+    Guess the format of a proxy list from its first non-blank line.
+
+    :param first: First non-blank line of the input.
+    :return: 'json' (a JSON array or object), 'jsonl' (one JSON object per line) or 'txt' ('ip:port protocol').
+    """
+
+    first = first.lstrip()
+
+    if first.startswith('['):
+        return 'json'
+
+    if first.startswith('{'):
+        # A whole object on the first line is JSON-lines (a minified Geonode response included, see read_proxies);
+        # an object spread over many lines is a JSON document.
+        try:
+            json.loads(first)
+            return 'jsonl'
+        except ValueError:
+            return 'json'
+
+    return 'txt'
+
+
+def parse_txt(line: str) -> list:
+    """Parse one 'ip:port protocol' line (the protocol defaults to http; several may be comma separated)."""
+    fields = line.split()
+    address, protocols = fields[0], fields[1] if len(fields) > 1 else 'http'
+    ip, _, port = address.rpartition(':')
+    return [{'ip': ip.strip('[]'), 'port': port, 'protocol': protocol} for protocol in protocols.split(',')]
+
+
+def parse_record(record: dict) -> list:
+    """Parse one JSON proxy record: standard ({'ip', 'port', 'protocol'}) or Geonode ({'ip', 'port', 'protocols'})."""
+    if 'protocols' in record and 'protocol' not in record:
+        return [{'ip': record.get('ip', ''), 'port': record.get('port', ''), 'protocol': protocol}
+                for protocol in record.get('protocols') or []]
+    return [record]
+
+
+def read_proxies(stream, fmt: str = 'auto'):
+    """
+    Read proxies from a text stream, lazily for the line-based formats.
+
+    :param stream: Text stream (a file or stdin).
+    :param fmt: 'auto', 'txt', 'json' or 'jsonl'. Default is 'auto'.
+    :return: Generator of proxy dictionaries ('ip', 'port', 'protocol').
+    """
+
+    lines = iter(stream)
+    first = next((line for line in lines if line.strip()), None)
+    if first is None:
+        return
+
+    fmt = detect_format(first) if fmt == 'auto' else fmt
+
+    if fmt == 'json':
+        # A JSON document has to be read whole: a list of records or a Geonode response ({'data': [...]}).
+        document = json.loads(first + ''.join(lines))
+        records = document.get('data', []) if isinstance(document, dict) else document
+        for record in records:
+            yield from parse_record(record)
+        return
+
+    for line in itertools.chain([first], lines):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        try:
+            if fmt == 'txt':
+                yield from parse_txt(line)
+                continue
+
+            # A minified Geonode response is a single line too: expand its 'data' records.
+            record = json.loads(line)
+            if isinstance(record, dict) and isinstance(record.get('data'), list):
+                for item in record['data']:
+                    yield from parse_record(item)
+            else:
+                yield from parse_record(record)
+        except (ValueError, IndexError, AttributeError):
+            print(f'Skipping malformed line: {line[:80]}', file=sys.stderr)
+
+
+def read_inputs(paths: list, fmt: str = 'auto'):
+    """
+    Read proxies from files, one after the other ('-' is stdin).
+
+    :param paths: List of file paths.
+    :param fmt: 'auto', 'txt', 'json' or 'jsonl'. Default is 'auto'.
+    :return: Generator of proxy dictionaries.
+    """
+
+    for path in paths:
+        if path == '-':
+            yield from read_proxies(sys.stdin, fmt)
+        else:
+            with open(path, 'r', encoding='utf-8') as file:
+                yield from read_proxies(file, fmt)
+
+
+# Filter: Pre-filter
+def prefilter(toolkit: Toolkit, proxies, counts: dict):
+    """
+    Drop the proxies that can never pass the check (see Toolkit.classify_proxies), one by one as they stream in.
+
+    :param toolkit: Toolkit holding the blocklist / allowlist.
+    :param proxies: Iterable of proxy dictionaries.
+    :param counts: Dictionary updated with the number of rejected proxies per reason.
+    :return: Generator of the kept proxies.
+    """
+
+    for proxy in proxies:
+        reason = toolkit.classify_proxies([proxy])[0]
+        if reason is None:
+            yield proxy
+        else:
+            counts[reason] = counts.get(reason, 0) + 1
+
+
+# Formats: Output
+def format_result(result: dict, output: str) -> str:
+    """
+    Format one check result as an output line.
+
+    :param result: Check result dictionary (as returned by Toolkit.check_the_proxy).
+    :param output: 'jsonl' (one JSON object per line) or 'txt' ('ip:port protocol').
+    :return: The line, without a newline.
+    """
+
+    info = result['info']
+
+    if output == 'txt':
+        return f"{info['ip']}:{info['port']} {info['protocol']}"
+
+    line = {
+        'ip': info['ip'],
+        'port': info['port'],
+        'protocol': info['protocol'],
+        'alive': result['alive'],
+        'time': None if result.get('time') is None else round(result['time'], 4),  # None: the check never ran.
+    }
+    if result.get('status_code') is not None:
+        line['code'] = result['status_code']
+    if result.get('depth'):
+        line['depth'] = result['depth']
+    if result.get('phases'):
+        line['phases'] = {phase: round(seconds, 4) for phase, seconds in result['phases'].items()}
+        line['bytes'] = result.get('bytes', 0)
+    if result.get('error'):
+        line['error'] = result['error']
+
+    return json.dumps(line)
+
+
+def split_address(address: str, default_port: int = 7700) -> tuple:
+    """Split 'host:port' (or 'host', or ':port') into a (host, port) tuple; the host defaults to 127.0.0.1."""
+    host, _, port = address.rpartition(':') if ':' in address else (address, '', '')
+    return host.strip('[]') or '127.0.0.1', int(port) if port else default_port
+
+
+def log_to_stderr(message: str, **_) -> None:
+    """Echo replacement for the coordinator and worker logs: plain text on stderr."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description='Check proxies from files or stdin and stream the alive ones to stdout as they finish.',
+        epilog='Example: cat proxies.txt | python cli.py --depth handshake --concurrency 64 > alive.jsonl',
+    )
+
+    parser.add_argument('inputs', nargs='*', default=['-'],
+                        help="Proxy lists to read ('-' for stdin, the default).")
+    parser.add_argument('-f', '--format', choices=('auto', 'txt', 'json', 'jsonl'), default='auto',
+                        help="Input format: 'ip:port protocol' lines, a JSON list (or Geonode response), "
+                             "or JSON-lines. Default: auto-detect.")
+    parser.add_argument('-o', '--output', choices=('jsonl', 'txt'), default='jsonl',
+                        help='Output format. Default: jsonl.')
+    parser.add_argument('-c', '--concurrency', type=int, default=16,
+                        help='Number of concurrent checks. Default: 16.')
+    parser.add_argument('-t', '--timeout', type=float, default=9,
+                        help='Timeout of each check in seconds. Default: 9.')
+    parser.add_argument('-d', '--depth', choices=('connect', 'handshake', 'full'), default='full',
+                        help="How deep to check: TCP 'connect', proxy 'handshake' or a 'full' HTTP request. "
+                             "Default: full.")
+    parser.add_argument('--view', default=None,
+                        help='Test URL. Default: the toolkit view (https://www.google.com).')
+    parser.add_argument('--target', type=int, default=None,
+                        help='Stop once this many proxies are alive.')
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='Stop after this many seconds.')
+    parser.add_argument('-a', '--all', action='store_true',
+                        help='Print every result, not only the alive proxies.')
+    parser.add_argument('--blocklist', action='append', default=[],
+                        help='Skip the proxies in these networks '
+                             '(file of CIDRs, IPs or "START END" ranges, one per line; repeatable).')
+    parser.add_argument('--allowlist', action='append', default=[],
+                        help='Only check the proxies in these networks '
+                             '(file of CIDRs, IPs or "START END" ranges, one per line; repeatable).')
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help='Check every proxy, even invalid or reserved addresses.')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Do not print the run statistics to stderr.')
+
+    distributed = parser.add_argument_group('distributed checking')
+    distributed.add_argument('--listen', metavar='HOST:PORT', default=None,
+                             help='Coordinator: shard the inputs and let workers check them (e.g. :7700 on this '
+                                  'host, 0.0.0.0:7700 for remote workers; workers are not authenticated, '
+                                  'so only listen on a trusted network).')
+    distributed.add_argument('--shard-size', type=int, default=64,
+                             help='Coordinator: number of proxies per shard. Default: 64.')
+    distributed.add_argument('--worker', metavar='HOST:PORT', default=None,
+                             help="Worker: check shards from the coordinator at HOST:PORT (uses --concurrency).")
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """
+    proxyToolkit command line.
+    Reads proxies from files or stdin, checks them concurrently and streams the results to stdout
+    (one line each, flushed as soon as a check finishes). Statistics go to stderr, so stdout can be piped.
+    With --listen the checks run on remote workers (started with --worker) instead of locally.
+
+    :param argv: Command-line arguments (default: sys.argv[1:]).
+    :return: Exit status (0 if at least one proxy is alive, 1 otherwise, 2 if an input or network list cannot be read).
+    """
+
+    args = build_parser().parse_args(argv)
+    log = None if args.quiet else log_to_stderr
+
+    # The toolkit stays silent: stdout only carries results.
+    toolkit = Toolkit()
+    toolkit.echo = lambda *_, **__: None
+    if args.view:
+        toolkit.view = args.view
+
+    # Worker mode: the coordinator sends the proxies and collects the results.
+    if args.worker:
+        host, port = split_address(args.worker)
+        try:
+            Distributed.Worker(toolkit, host, port=port, workers=args.concurrency, echo=log).run()
+        except OSError as e:
+            print(f'Cannot reach the coordinator at {host}:{port} ({e})', file=sys.stderr)
+            return 1
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    # Loaded here rather than with toolkit.load_blocklist / load_allowlist, whose errors only go to the (silenced) echo:
+    # a missing or malformed list must stop the run, not check every proxy (or none).
+    try:
+        for path in args.blocklist:
+            toolkit.blocklist = toolkit.blocklist or Network.NetworkIndex()
+            toolkit.blocklist.load(path, label='blocklist')
+        for path in args.allowlist:
+            toolkit.allowlist = toolkit.allowlist or Network.NetworkIndex()
+            toolkit.allowlist.load(path, label='allowlist')
+    except (OSError, ValueError) as e:
+        print(f'Cannot load network list: {e}', file=sys.stderr)
+        return 2
+
+    rejected = {}
+    proxies = read_inputs(args.inputs, args.format)
+    if not args.no_prefilter:
+        proxies = prefilter(toolkit, proxies, rejected)
+
+    started = time.monotonic()
+    checked = alive = 0
+    coordinator = None
+
+    if args.listen:
+        # Coordinator mode: the whole list is sharded up front; workers stream the results back.
+        host, port = split_address(args.listen)
+        try:
+            proxies = list(proxies)
+        except (OSError, ValueError) as e:
+            print(f'Cannot read the input: {e}', file=sys.stderr)
+            return 2
+        coordinator = Distributed.Coordinator(proxies, host=host, port=port, shard_size=args.shard_size,
+                                              timeout=args.timeout, depth=args.depth, view=toolkit.view, echo=log)
+        coordinator.start()
+        stream = coordinator.results_stream(args.deadline)
+    else:
+        stream = toolkit.stream_the_proxies(proxies, workers=args.concurrency, timeout=args.timeout,
+                                            depth=args.depth, deadline=args.deadline)
+
+    try:
+        for _, result in stream:
+            checked += 1
+            alive += bool(result['alive'])
+
+            if result['alive'] or args.all:
+                sys.stdout.write(format_result(result, args.output) + '\n')
+                sys.stdout.flush()
+
+            if args.target is not None and alive >= args.target:
+                break
+
+    except BrokenPipeError:
+        # The reader went away (e.g. '| head'): stop quietly, without a traceback when Python flushes stdout on exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+    except (OSError, ValueError) as e:
+        # The input is read lazily, as the checks go: a missing file, a broken JSON document or undecodable
+        # bytes surface here. Exit with 2, so a failed run is not mistaken for one without alive proxies.
+        print(f'Cannot read the input: {e}', file=sys.stderr)
+        return 2
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        stream.close()
+        if coordinator is not None:
+            coordinator.close()
+
+    if not args.quiet:
+        rejects = ', '.join(f'{reason}: {count}' for reason, count in sorted(rejected.items()))
+        print(f'Checked {checked}, alive {alive}, rejected {sum(rejected.values())}'
+              f"{f' ({rejects})' if rejects else ''} in {time.monotonic() - started:.2f}s", file=sys.stderr)
+
+    return 0 if alive else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
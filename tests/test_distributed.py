@@ -0,0 +1,97 @@
+import os  # For the repository root of the worker subprocesses.
+import socket  # For the local proxies the workers check.
+import subprocess  # For running the workers as separate processes.
+import sys  # For the interpreter running the workers.
+import threading  # For accepting connections on the local proxies.
+import time  # For waiting on the coordinator.
+import unittest
+
+import Distributed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A worker process, as 'cli.py --worker' would start it (without the output).
+WORKER = (
+    'import sys; from Toolkit import Toolkit; import Distributed; '
+    'toolkit = Toolkit(); toolkit.echo = lambda *_, **__: None; '
+    'Distributed.Worker(toolkit, "127.0.0.1", port=int(sys.argv[1]), workers=4, connect_for=10).run()'
+)
+
+
+def accept_forever(server: socket.socket) -> None:
+    """Accept and close connections until the listening socket is closed."""
+    while True:
+        try:
+            connection, _ = server.accept()
+        except OSError:
+            return
+        connection.close()
+
+
+def wait_for(condition, timeout: float = 10) -> bool:
+    """Poll a condition until it holds or the timeout passes."""
+    started = time.monotonic()
+    while not condition():
+        if time.monotonic() - started > timeout:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+class CoordinatorWorkersTest(unittest.TestCase):
+    """A Coordinator with two local Worker processes, one of them killed while it holds a shard."""
+
+    def listen(self, backlog: int) -> socket.socket:
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(backlog)
+        self.addCleanup(server.close)
+        return server
+
+    def start_worker(self, port: int) -> subprocess.Popen:
+        worker = subprocess.Popen([sys.executable, '-c', WORKER, str(port)], cwd=ROOT,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(worker.wait)
+        self.addCleanup(worker.kill)
+        return worker
+
+    def test_lost_worker_shard_is_requeued_and_every_proxy_answered_once(self):
+        # A proxy that accepts at once, and a tarpit whose full backlog leaves new connects hanging.
+        fast = self.listen(128)
+        threading.Thread(target=accept_forever, args=(fast,), daemon=True).start()
+        tarpit = self.listen(0)
+        filler = socket.create_connection(tarpit.getsockname(), timeout=5)
+        self.addCleanup(filler.close)
+
+        # The first shard hangs on the tarpit; the second one is checked at once.
+        proxies = [{'ip': '127.0.0.1', 'port': str(tarpit.getsockname()[1]), 'protocol': 'http', 'n': n}
+                   for n in range(4)]
+        proxies += [{'ip': '127.0.0.1', 'port': str(fast.getsockname()[1]), 'protocol': 'http', 'n': n}
+                    for n in range(4, 8)]
+
+        coordinator = Distributed.Coordinator(proxies, port=0, shard_size=4, timeout=20, depth='connect',
+                                              view='http://127.0.0.1/')
+        coordinator.start()
+        self.addCleanup(coordinator.close)
+
+        # The first worker takes the tarpit shard, the second one the other shard.
+        doomed = self.start_worker(coordinator.port)
+        self.assertTrue(wait_for(lambda: coordinator.stats['shards'] == 1))
+        self.start_worker(coordinator.port)
+        self.assertTrue(wait_for(lambda: coordinator.stats['shards'] == 2 and coordinator.stats['results'] == 4))
+
+        # Kill the first worker mid-shard, then let the tarpit accept: its shard goes to the other worker.
+        doomed.kill()
+        self.assertTrue(wait_for(lambda: coordinator.stats['lost'] == 1))
+        threading.Thread(target=accept_forever, args=(tarpit,), daemon=True).start()
+
+        results = list(coordinator.results_stream(deadline=30))
+
+        self.assertEqual(coordinator.stats['requeued'], 4)
+        self.assertEqual(sorted(proxy['n'] for proxy, _ in results), list(range(8)))
+        self.assertTrue(all(result['alive'] for _, result in results))
+        self.assertEqual(coordinator.stats['results'], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
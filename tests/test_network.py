@@ -0,0 +1,92 @@
+import os  # For the temporary network files.
+import tempfile  # For writing network files to load.
+import unittest
+
+import Network
+
+
+class CompileTest(unittest.TestCase):
+    """NetworkIndex.compile: nested, partially overlapping and merged ranges."""
+
+    def build(self, *ranges) -> Network.NetworkIndex:
+        index = Network.NetworkIndex()
+        for start, end, label in ranges:
+            index.add_range(4, start, end, label)
+        index.compile()
+        return index
+
+    def flat(self, index: Network.NetworkIndex) -> list:
+        return list(zip(index.starts[4], index.ends[4], index.labels[4]))
+
+    def test_nested_range_is_more_specific(self):
+        index = self.build((0, 100, 'wide'), (10, 20, 'narrow'))
+        self.assertEqual(self.flat(index), [(0, 9, 'wide'), (10, 20, 'narrow'), (21, 100, 'wide')])
+
+    def test_partial_overlap_is_split_not_clipped(self):
+        index = self.build((0, 10, 'a'), (5, 15, 'b'))
+        self.assertEqual(self.flat(index), [(0, 4, 'a'), (5, 15, 'b')])
+        for value in range(11, 16):
+            self.assertEqual(index.lookup((4, value)), 'b')
+        self.assertIsNone(index.lookup((4, 16)))
+
+    def test_chained_overlaps_inside_an_enclosing_range(self):
+        index = self.build((0, 100, 'a'), (10, 20, 'b'), (15, 30, 'c'), (25, 200, 'd'))
+        self.assertEqual(self.flat(index), [(0, 9, 'a'), (10, 14, 'b'), (15, 24, 'c'), (25, 200, 'd')])
+
+    def test_adjacent_ranges_with_the_same_label_merge(self):
+        index = self.build((0, 9, 'a'), (10, 19, 'a'), (20, 29, 'b'))
+        self.assertEqual(self.flat(index), [(0, 19, 'a'), (20, 29, 'b')])
+
+    def test_coverage_is_the_union_of_the_ranges(self):
+        ranges = [(3, 40, 'a'), (10, 12, 'b'), (11, 50, 'a'), (45, 60, 'b'), (0, 1, 'b'), (55, 58, 'a')]
+        index = self.build(*ranges)
+        covered = {value for start, end, _ in ranges for value in range(start, end + 1)}
+        self.assertEqual({value for value in range(70) if index.lookup((4, value))}, covered)
+        flat = self.flat(index)
+        self.assertTrue(all(flat[flag][0] > flat[flag - 1][1] for flag in range(1, len(flat))))
+
+    def test_adding_after_compile_recompiles_everything(self):
+        index = self.build((0, 10, 'a'))
+        index.add_range(4, 5, 15, 'b')
+        index.compile()
+        self.assertEqual(self.flat(index), [(0, 4, 'a'), (5, 15, 'b')])
+
+
+class LoadTest(unittest.TestCase):
+    """NetworkIndex.load: CIDRs, addresses and 'START END' ranges, across repeated loads."""
+
+    def write(self, text: str) -> str:
+        file = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False)
+        file.write(text)
+        file.close()
+        self.addCleanup(os.unlink, file.name)
+        return file.name
+
+    def test_every_line_format(self):
+        index = Network.NetworkIndex.from_file(self.write(
+            '# comment\n1.2.3.0 1.2.3.255\n5.5.5.0/24  # trailing comment\n\n9.9.9.9\n2001:db8::/32\n'
+        ))
+        for ip in ('1.2.3.0', '1.2.3.128', '1.2.3.255', '5.5.5.9', '9.9.9.9', '2001:db8::1'):
+            self.assertIn(ip, index)
+        for ip in ('1.2.4.0', '9.9.9.8', '2001:db9::1'):
+            self.assertNotIn(ip, index)
+
+    def test_repeated_loads_merge(self):
+        index = Network.NetworkIndex()
+        index.load(self.write('10.0.0.0 10.0.0.10\n'), label='first')
+        index.load(self.write('10.0.0.5 10.0.0.15\n'), label='second')
+        self.assertEqual(index.lookup('10.0.0.2'), 'first')
+        self.assertEqual(index.lookup('10.0.0.12'), 'second')
+        self.assertIsNone(index.lookup('10.0.0.16'))
+
+    def test_bad_line_raises_and_adds_nothing(self):
+        index = Network.NetworkIndex()
+        with self.assertRaises(ValueError):
+            index.load(self.write('8.8.8.8\n1.2.3.0 not-an-address\n'))
+        with self.assertRaises(ValueError):
+            index.load(self.write('1.2.3.0 2001:db8::1\n'))
+        self.assertNotIn('8.8.8.8', index)
+
+
+if __name__ == '__main__':
+    unittest.main()